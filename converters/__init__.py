@@ -0,0 +1,7 @@
+"""
+Conversores de áudio, vídeo, imagem e listas de músicas.
+
+Use pela linha de comando: `python -m converters <subcomando> --help`.
+Cada subcomando só importa suas dependências (Pillow, yt-dlp, eyed3...)
+quando é executado.
+"""
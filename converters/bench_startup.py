@@ -0,0 +1,77 @@
+"""
+Benchmark de inicialização do CLI: `python -m converters.bench_startup`
+
+Mede o tempo (mediana de várias execuções) de `--help` e de trabalhos
+pequenos de cada subcomando, em processos novos, e falha se algum passar
+do orçamento. O tempo de `python -c pass` é mostrado como referência.
+"""
+
+import os
+import sys
+import time
+import argparse
+import tempfile
+import statistics
+import subprocess
+
+# Orçamento padrão de inicialização, em milissegundos
+ORCAMENTO_MS = 150
+
+
+def medir(argumentos, repeticoes, cwd=None):
+    """Mediana, em ms, do tempo de parede de `python <argumentos>`."""
+    tempos = []
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        subprocess.run([sys.executable, *argumentos], cwd=cwd, check=True,
+                       stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, stdin=subprocess.DEVNULL)
+        tempos.append((time.perf_counter() - inicio) * 1000)
+    return statistics.median(tempos)
+
+
+def casos(pasta):
+    """Comandos medidos: ajuda geral, ajuda de cada subcomando e trabalhos vazios."""
+    vazia = os.path.join(pasta, "vazia")
+    os.makedirs(vazia, exist_ok=True)
+    lista = os.path.join(pasta, "lista.txt")
+    open(lista, "w").close()
+
+    yield "--help", ["--help"]
+    for subcomando in ("exif", "webp", "webm", "video", "csv", "id3", "fetch", "audio", "reconcile"):
+        yield f"{subcomando} --help", [subcomando, "--help"]
+    yield "exif <pasta vazia>", ["exif", vazia]
+    yield "webp <pasta vazia>", ["webp", vazia, "-o", os.path.join(pasta, "webp")]
+    yield "webm <pasta vazia>", ["webm", vazia, "-o", os.path.join(pasta, "webm")]
+    yield "csv <pasta vazia>", ["csv", vazia, "-o", os.path.join(pasta, "saida.txt")]
+    yield "fetch <lista vazia>", ["fetch", lista, "-o", os.path.join(pasta, "musicas"), "--sem-cache"]
+    yield "reconcile <pasta vazia>", ["reconcile", lista, vazia, "-o", os.path.join(pasta, "reconcile")]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Mede o tempo de inicialização do CLI converters")
+    parser.add_argument("--orcamento", type=float, default=ORCAMENTO_MS,
+                        help=f"Tempo máximo por comando em ms (padrão: {ORCAMENTO_MS})")
+    parser.add_argument("-n", "--repeticoes", type=int, default=5, help="Execuções por comando (padrão: 5)")
+    args = parser.parse_args()
+
+    raiz = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    base = medir(["-c", "pass"], args.repeticoes)
+    print(f"{'python -c pass':<24} {base:7.1f} ms (referência)")
+
+    estourados = []
+    with tempfile.TemporaryDirectory(prefix="bench_startup_") as pasta:
+        for nome, argumentos in casos(pasta):
+            ms = medir(["-m", "converters", *argumentos], args.repeticoes, cwd=raiz)
+            marca = "OK" if ms <= args.orcamento else "ESTOUROU"
+            print(f"{nome:<24} {ms:7.1f} ms  {marca}")
+            if ms > args.orcamento:
+                estourados.append(nome)
+
+    if estourados:
+        print(f"\n{len(estourados)} comandos acima do orçamento de {args.orcamento:.0f} ms: {', '.join(estourados)}")
+        sys.exit(1)
+    print(f"\nTodos os comandos dentro do orçamento de {args.orcamento:.0f} ms.")
+
+
+if __name__ == "__main__":
+    main()
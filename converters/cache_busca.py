@@ -0,0 +1,101 @@
+import os
+import time
+import sqlite3
+import threading
+from .estado_downloads import normalizar_linha
+from .padroes import CACHE_BUSCAS, DIAS_CACHE_BUSCAS
+
+ARQUIVO_CACHE = os.path.expanduser(CACHE_BUSCAS)
+
+# Validade de um resultado de busca e limite de entradas
+TTL_PADRAO = DIAS_CACHE_BUSCAS * 24 * 3600
+MAXIMO_PADRAO = 20000
+
+
+class CacheBusca:
+    """
+    Cache em disco de consulta -> mídia resolvida, com validade (TTL) e
+    descarte das entradas usadas há mais tempo (LRU) quando passa do limite.
+
+    Guarda também quanto tempo a busca original levou, para estimar o tempo
+    economizado a cada acerto.
+    """
+
+    def __init__(self, caminho=ARQUIVO_CACHE, ttl=TTL_PADRAO, maximo=MAXIMO_PADRAO):
+        os.makedirs(os.path.dirname(os.path.abspath(caminho)), exist_ok=True)
+        self.ttl = ttl
+        self.maximo = maximo
+        self.lock = threading.Lock()
+        self.acertos = 0
+        self.erros = 0
+        self.economizado = 0.0
+        self.conexao = sqlite3.connect(caminho, check_same_thread=False)
+        self.conexao.execute("PRAGMA journal_mode=WAL")
+        self.conexao.execute("""
+            CREATE TABLE IF NOT EXISTS buscas (
+                chave TEXT PRIMARY KEY,
+                consulta TEXT NOT NULL,
+                media_id TEXT,
+                url TEXT NOT NULL,
+                custo REAL NOT NULL,
+                criado_em REAL NOT NULL,
+                usado_em REAL NOT NULL
+            )
+        """)
+        self.conexao.execute("CREATE INDEX IF NOT EXISTS idx_buscas_usado_em ON buscas (usado_em)")
+        self.conexao.commit()
+
+    def obter(self, consulta):
+        """Devolve (media_id, url) se a consulta estiver no cache e dentro da validade."""
+        chave = normalizar_linha(consulta)
+        agora = time.time()
+        with self.lock:
+            linha = self.conexao.execute(
+                "SELECT media_id, url, custo, criado_em FROM buscas WHERE chave = ?", (chave,)).fetchone()
+            if linha and agora - linha[3] <= self.ttl:
+                self.conexao.execute("UPDATE buscas SET usado_em = ? WHERE chave = ?", (agora, chave))
+                self.conexao.commit()
+                self.acertos += 1
+                self.economizado += linha[2]
+                return linha[0], linha[1]
+            if linha:
+                self.conexao.execute("DELETE FROM buscas WHERE chave = ?", (chave,))
+                self.conexao.commit()
+            self.erros += 1
+            return None
+
+    def guardar(self, consulta, media_id, url, custo):
+        agora = time.time()
+        with self.lock:
+            self.conexao.execute(
+                "INSERT OR REPLACE INTO buscas VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (normalizar_linha(consulta), consulta, media_id, url, custo, agora, agora),
+            )
+            self.conexao.commit()
+
+    def podar(self):
+        """Remove as entradas vencidas e as usadas há mais tempo além do limite."""
+        with self.lock:
+            self.conexao.execute("DELETE FROM buscas WHERE criado_em < ?", (time.time() - self.ttl,))
+            self.conexao.execute(
+                """
+                DELETE FROM buscas WHERE chave IN (
+                    SELECT chave FROM buscas ORDER BY usado_em DESC LIMIT -1 OFFSET ?
+                )
+                """,
+                (self.maximo,),
+            )
+            self.conexao.commit()
+
+    def relatorio(self):
+        total = self.acertos + self.erros
+        if not total:
+            return "Cache de buscas: nenhuma consulta."
+        taxa = self.acertos / total * 100
+        return (f"Cache de buscas: {self.acertos}/{total} acertos ({taxa:.0f}%), "
+                f"~{self.economizado:.0f}s de busca economizados.")
+
+    def fechar(self):
+        self.podar()
+        with self.lock:
+            self.conexao.close()
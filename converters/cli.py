@@ -0,0 +1,351 @@
+"""
+Ponto de entrada único: `converters <subcomando> ...`
+
+Este módulo só monta os argumentos; o módulo de cada subcomando (e as
+bibliotecas que ele usa) é importado dentro do handler, na hora de executar.
+Por isso `--help` e trabalhos pequenos abrem rápido.
+"""
+
+import os
+import sys
+import argparse
+from .padroes import (CACHE_BUSCAS, DIAS_CACHE_BUSCAS, FORMATOS_IMAGEM, LIMIAR_DUPLICATAS,
+                      LIMIAR_SIMILARIDADE, MAXIMO_APROXIMADAS, MODOS_AUDIO, PASTA_DOWNLOADS_AUDIO,
+                      PASTA_IMAGENS_CONVERTIDAS, PASTA_VIDEOS_CONVERTIDOS)
+
+
+def _pasta_valida(caminho):
+    if not os.path.isdir(caminho):
+        print(f"\033[91mErro: O caminho fornecido não é uma pasta válida: {caminho}\033[0m")
+        sys.exit(1)
+    return caminho
+
+
+def executar_exif(args):
+    from .limpar_exif import processar_pasta
+
+    pasta = args.pasta or input("Digite o caminho da pasta que deseja processar: ")
+    _pasta_valida(pasta)
+    print("\033[94mIniciando a limpeza de EXIF e metadados...\033[0m")
+    processar_pasta(pasta, args.listar_duplicatas, args.limiar)
+    print("\033[92mProcessamento concluído!\033[0m")
+
+
+def executar_webp(args):
+    from .webp_converter import benchmark, converter_pasta
+
+    _pasta_valida(args.pasta)
+    if args.benchmark:
+        benchmark(args.pasta, args.formato, args.qualidade, args.max_lado, args.workers)
+        return
+    convertidas, puladas, erros = converter_pasta(args.pasta, args.saida, args.formato, args.qualidade,
+                                                  args.max_lado, args.workers, forcar=args.forcar,
+                                                  deduplicar=args.deduplicar, limiar=args.limiar,
+                                                  vincular_duplicatas=not args.so_relatar)
+    print(f"Conversão concluída! {len(convertidas)} convertidas, {puladas} já atualizadas, {len(erros)} erros.")
+
+
+def executar_webm(args):
+    from .webm_converter import converter_pasta
+
+    _pasta_valida(args.pasta)
+    resultados = converter_pasta(args.pasta, args.saida, args.workers, args.remux, args.preset, args.crf)
+    print(f"Conversão concluída! {resultados['remux']} remuxados, "
+          f"{resultados['transcodificado']} transcodificados, {resultados['erro']} erros.")
+
+
+def executar_video(args):
+    from .video_converter import Colors, VideoConverter
+
+    # Se não passou o source, pede interativamente
+    source_path = args.source
+    if not source_path:
+        print(f"{Colors.CYAN}{'='*80}{Colors.ENDC}")
+        print(f"{Colors.BOLD}CONVERSOR DE VÍDEOS EM LOTE{Colors.ENDC}")
+        print(f"{Colors.CYAN}{'='*80}{Colors.ENDC}\n")
+        source_path = input(f"{Colors.YELLOW}Digite o caminho da pasta com os vídeos: {Colors.ENDC}").strip().strip('"').strip("'")
+
+        if not source_path:
+            print(f"{Colors.RED}Nenhum caminho fornecido. Encerrando.{Colors.ENDC}")
+            return
+        args.source = source_path  # o --profile grava ao lado do log, na pasta escolhida
+
+    # Valida pasta de origem
+    if not os.path.isdir(source_path):
+        print(f"{Colors.RED}ERRO: Pasta não encontrada: {source_path}{Colors.ENDC}")
+        return
+
+    converter = VideoConverter(
+        source_dir=source_path,
+        output_dir=args.output,
+        threads=args.threads,
+        delete_original=args.delete_original,
+        target_bitrate=args.bitrate,
+        dry_run=args.dry_run,
+        min_height=args.min_height
+    )
+    converter.run()
+
+
+def executar_csv(args):
+    from .csv_txt_converter import gerar_lista
+
+    gerar_lista(_pasta_valida(args.pasta), args.saida)
+
+
+def executar_id3(args):
+    from .id3tags_rename_mp3 import atualizar_tags_e_renomear
+
+    atualizar_tags_e_renomear(args.origem, args.destino)
+
+
+def executar_fetch(args):
+    from .txt_mp3_converter import baixar_lista
+
+    cache = None
+    if not args.sem_cache:
+        from .cache_busca import CacheBusca
+        cache = CacheBusca(os.path.expanduser(args.cache), ttl=args.cache_dias * 86400)
+    try:
+        baixar_lista(args.lista, args.destino, args.buscas, args.downloads,
+                     args.extracoes, args.tentativas, args.qualidade, refazer=args.refazer,
+                     modo=args.modo, cache=cache)
+    finally:
+        if cache:
+            cache.fechar()
+    print(f"Músicas salvas na pasta '{args.destino}'!")
+
+
+def executar_audio(args):
+    urls = list(args.urls)
+    if args.lista:
+        with open(args.lista, encoding="utf-8") as file:
+            urls.extend(line.strip() for line in file if line.strip() and not line.startswith('#'))
+    if not urls:
+        print("Cole o link do vídeo do YouTube e pressione Enter:")
+        url = input().strip()
+        if url:
+            urls.append(url)
+    if not urls:
+        print("Nenhum link fornecido!")
+        return
+
+    from .mp4_to_mp3 import download_audio
+    download_audio(urls, args.modo, args.workers, args.fragmentos, args.paralelos, args.saida)
+
+
+def executar_reconcile(args):
+    from .reconciliar import reconciliar_lista
+
+    _pasta_valida(args.biblioteca)
+    reconciliar_lista(args.lista, args.biblioteca, args.saida, args.limiar, args.workers, args.max_aproximadas)
+
+
+def criar_parser():
+    parser = argparse.ArgumentParser(
+        prog="converters",
+        description="Conversores de áudio, vídeo, imagem e listas de músicas",
+    )
+    parser.add_argument("--trace", metavar="ARQUIVO.json",
+                        help="Registra as etapas (spans) e grava um trace do Chrome/Perfetto, "
+                             "com uma tabela de tempos por etapa no final")
+    parser.add_argument("--profile", action="store_true",
+                        help="Roda sob cProfile (thread principal e threads de trabalho; os processos "
+                             "do webp e do exif ficam de fora) e tracemalloc; os resultados ficam na "
+                             "pasta de saída do subcomando (ao lado do log) ou, sem ela, ao lado do --trace")
+    sub = parser.add_subparsers(dest="comando", metavar="<subcomando>", required=True)
+
+    # exif
+    p = sub.add_parser("exif", help="Remove EXIF e metadados de imagens e vídeos")
+    p.add_argument("pasta", nargs="?", help="Pasta a processar (se omitida, é pedida no terminal)")
+    p.add_argument("--listar-duplicatas", action="store_true",
+                   help="Também lista os grupos de quase duplicatas (dHash); todas as cópias são limpas")
+    p.add_argument("--limiar", type=int, default=LIMIAR_DUPLICATAS,
+                   help=f"Bits de diferença tolerados entre duplicatas (padrão: {LIMIAR_DUPLICATAS})")
+    p.set_defaults(executar=executar_exif)
+
+    # webp
+    p = sub.add_parser("webp", help="Converte imagens .webp em lote")
+    p.add_argument("pasta", help="Pasta com as imagens .webp")
+    p.add_argument("-o", "--saida", help=f"Pasta de destino (padrão: <pasta>/{PASTA_IMAGENS_CONVERTIDAS})")
+    p.add_argument("-f", "--formato", choices=FORMATOS_IMAGEM, default="jpeg",
+                   help="Formato de destino (padrão: jpeg)")
+    p.add_argument("-q", "--qualidade", type=int, default=75,
+                   help="Qualidade para jpeg/webp, 1-100 (padrão: 75)")
+    p.add_argument("--max-lado", type=int, default=None,
+                   help="Reduz as imagens para que o maior lado tenha no máximo N pixels")
+    p.add_argument("-w", "--workers", type=int, default=None,
+                   help="Processos simultâneos (padrão: núcleos da CPU)")
+    p.add_argument("--forcar", action="store_true", help="Reconverte mesmo as imagens já convertidas")
+    p.add_argument("--deduplicar", action="store_true",
+                   help="Converte só uma imagem de cada grupo de quase duplicatas (dHash)")
+    p.add_argument("--limiar", type=int, default=LIMIAR_DUPLICATAS,
+                   help=f"Bits de diferença tolerados entre duplicatas (padrão: {LIMIAR_DUPLICATAS})")
+    p.add_argument("--so-relatar", action="store_true",
+                   help="Com --deduplicar, apenas lista as duplicatas em vez de criar links")
+    p.add_argument("--benchmark", action="store_true",
+                   help="Mede imagens/s do loop original contra o motor paralelo")
+    p.set_defaults(executar=executar_webp)
+
+    # webm
+    p = sub.add_parser("webm", help="Converte vídeos .webm para .mp4 com o ffmpeg")
+    p.add_argument("pasta", help="Pasta com os vídeos .webm")
+    p.add_argument("-o", "--saida", help=f"Pasta de destino (padrão: <pasta>/{PASTA_VIDEOS_CONVERTIDOS})")
+    p.add_argument("-w", "--workers", type=int, default=2,
+                   help="Conversões simultâneas (padrão: 2; o x264 já usa vários núcleos)")
+    p.add_argument("--remux", action="store_true",
+                   help="Copia VP9/AV1 e Opus para o MP4 sem reencodar (exige player compatível)")
+    p.add_argument("--preset", default="medium", help="Preset do libx264 (padrão: medium)")
+    p.add_argument("--crf", type=int, default=23, help="Qualidade do libx264, menor = melhor (padrão: 23)")
+    p.set_defaults(executar=executar_webm)
+
+    # video
+    p = sub.add_parser(
+        "video", help="Converte vídeos em lote para MP4 (H.264 + AAC) com upscale e legendas",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Exemplos de uso:
+  converters video /caminho/pasta/videos
+  converters video /origem -o /destino -t 4
+  converters video /videos --delete-original --bitrate 10M
+  converters video /videos --min-height 1080
+  converters video /videos --dry-run
+        """,
+    )
+    p.add_argument("source", nargs="?", help="Pasta com os vídeos para converter")
+    p.add_argument("-o", "--output", help="Pasta de destino (padrão: mesma da origem)")
+    p.add_argument("-t", "--threads", type=int, default=2,
+                   help="Número de conversões simultâneas (padrão: 2)")
+    p.add_argument("--min-height", type=int, default=720,
+                   help="Altura mínima em pixels (padrão: 720)")
+    p.add_argument("--delete-original", action="store_true",
+                   help="Deleta arquivos originais após conversão bem-sucedida")
+    p.add_argument("--bitrate", help="Bitrate alvo (ex: 8M, 12M). Se não especificado, calcula automaticamente")
+    p.add_argument("--dry-run", action="store_true", help="Simula a conversão sem processar arquivos")
+    p.set_defaults(executar=executar_video)
+
+    # csv
+    p = sub.add_parser("csv", help="Gera a lista de músicas a partir dos CSV de playlists")
+    p.add_argument("pasta", help="Pasta com os arquivos .csv exportados")
+    p.add_argument("-o", "--saida", default="lista_de_musicas.txt",
+                   help="Arquivo de saída (padrão: lista_de_musicas.txt)")
+    p.set_defaults(executar=executar_csv)
+
+    # id3
+    p = sub.add_parser("id3", help="Preenche as tags ID3 pelo nome do arquivo e renomeia os MP3")
+    p.add_argument("origem", help="Pasta com os MP3 originais")
+    p.add_argument("destino", help="Pasta onde os arquivos renomeados serão salvos")
+    p.set_defaults(executar=executar_id3)
+
+    # fetch
+    p = sub.add_parser("fetch", help="Baixa as músicas de uma lista .txt como MP3")
+    p.add_argument("lista", nargs="?", default="lista_de_musicas.txt",
+                   help="Arquivo .txt com uma música por linha (padrão: lista_de_musicas.txt)")
+    p.add_argument("-o", "--destino", default="musicas_baixadas",
+                   help="Pasta onde os áudios serão salvos (padrão: musicas_baixadas)")
+    p.add_argument("--buscas", type=int, default=4, help="Buscas simultâneas (padrão: 4)")
+    p.add_argument("--downloads", type=int, default=3, help="Downloads simultâneos (padrão: 3)")
+    p.add_argument("--extracoes", type=int, default=None,
+                   help="Conversões simultâneas (padrão: núcleos da CPU)")
+    p.add_argument("--tentativas", type=int, default=3, help="Tentativas por estágio (padrão: 3)")
+    p.add_argument("--qualidade", default="192", help="Bitrate do MP3 em kbps (padrão: 192)")
+    p.add_argument("--modo", choices=MODOS_AUDIO, default="mp3",
+                   help="mp3: transcodifica; original: mantém o Opus/M4A baixado sem reencodar")
+    p.add_argument("--refazer", action="store_true",
+                   help="Ignora o estado salvo e processa a lista inteira de novo")
+    p.add_argument("--sem-cache", action="store_true", help="Não usa o cache de buscas")
+    p.add_argument("--cache", default=CACHE_BUSCAS, help=f"Arquivo do cache de buscas (padrão: {CACHE_BUSCAS})")
+    p.add_argument("--cache-dias", type=float, default=DIAS_CACHE_BUSCAS,
+                   help=f"Validade de cada busca no cache, em dias (padrão: {DIAS_CACHE_BUSCAS})")
+    p.set_defaults(executar=executar_fetch)
+
+    # audio
+    p = sub.add_parser("audio", help="Baixa o áudio de vídeos ou playlists do YouTube")
+    p.add_argument("urls", nargs="*", help="Links de vídeos ou playlists (se omitidos, é pedido no terminal)")
+    p.add_argument("-l", "--lista", help="Arquivo .txt com um link por linha")
+    p.add_argument("-o", "--saida", help=f"Pasta de destino (padrão: ./{PASTA_DOWNLOADS_AUDIO})")
+    p.add_argument("--modo", choices=MODOS_AUDIO, default="mp3",
+                   help="mp3: transcodifica; original: mantém o Opus/M4A baixado sem reencodar")
+    p.add_argument("--workers", type=int, default=None,
+                   help="Extrações simultâneas (padrão: núcleos da CPU)")
+    p.add_argument("--fragmentos", type=int, default=4,
+                   help="Fragmentos baixados em paralelo por arquivo (padrão: 4)")
+    p.add_argument("--paralelos", type=int, default=2,
+                   help="Vídeos baixados ao mesmo tempo (padrão: 2)")
+    p.set_defaults(executar=executar_audio)
+
+    # reconcile
+    p = sub.add_parser("reconcile", help="Compara a lista de músicas com a biblioteca de MP3 (tags ID3)")
+    p.add_argument("lista", nargs="?", default="lista_de_musicas.txt",
+                   help="Arquivo .txt com uma música por linha (padrão: lista_de_musicas.txt)")
+    p.add_argument("biblioteca", nargs="?", default="musicas_id3",
+                   help="Pasta da biblioteca (padrão: musicas_id3)")
+    p.add_argument("-o", "--saida", default=".",
+                   help="Pasta onde faltando.txt, divergentes.txt e relatorio.tsv são gravados (padrão: .)")
+    p.add_argument("--limiar", type=float, default=LIMIAR_SIMILARIDADE,
+                   help=f"Similaridade mínima, 0-1, para aceitar uma faixa com outro título "
+                        f"(padrão: {LIMIAR_SIMILARIDADE})")
+    p.add_argument("--max-aproximadas", type=int, default=MAXIMO_APROXIMADAS,
+                   help=f"Linhas sem casamento exato que passam pela busca aproximada, 0 = todas "
+                        f"(padrão: {MAXIMO_APROXIMADAS}); as demais vão para nao_verificadas.txt")
+    p.add_argument("--workers", type=int, default=None,
+                   help="Arquivos lidos ao mesmo tempo ao indexar a biblioteca")
+    p.set_defaults(executar=executar_reconcile)
+
+    return parser
+
+
+# Pasta de saída de cada subcomando (onde ficam os resultados e logs), com os
+# mesmos padrões dos conversores; o --profile grava os seus arquivos nela
+PASTAS_SAIDA = {
+    "video": lambda args: args.output or (args.source if args.source and os.path.isdir(args.source) else None),
+    "webp": lambda args: args.saida or os.path.join(args.pasta, PASTA_IMAGENS_CONVERTIDAS),
+    "webm": lambda args: args.saida or os.path.join(args.pasta, PASTA_VIDEOS_CONVERTIDOS),
+    "id3": lambda args: args.destino,
+    "fetch": lambda args: args.destino,
+    "audio": lambda args: args.saida or PASTA_DOWNLOADS_AUDIO,
+    "reconcile": lambda args: args.saida,
+}
+
+
+def _prefixo_perfil(args, job):
+    """`<pasta de saída do subcomando>/<nome do --trace ou converters_<job>>`."""
+    nome = os.path.splitext(os.path.basename(args.trace))[0] if args.trace else f"converters_{job}"
+    pasta = PASTAS_SAIDA.get(args.comando, lambda _: None)(args)
+    if not pasta:
+        pasta = os.path.dirname(args.trace) if args.trace else ""
+    return os.path.join(pasta, nome)
+
+
+def executar_instrumentado(args):
+    """Roda o subcomando com o rastreador (--trace) e/ou o perfil (--profile) ligados."""
+    from datetime import datetime
+    from .rastreamento import RASTREADOR, executar_com_perfil
+
+    job = f"{args.comando}_{datetime.now():%Y%m%d_%H%M%S}"
+    if args.trace:
+        RASTREADOR.ativar(job)
+    try:
+        if args.profile:
+            # O prefixo só é resolvido no fim: o `video` pode pedir a pasta no terminal
+            executar_com_perfil(lambda: args.executar(args), lambda: _prefixo_perfil(args, job))
+        else:
+            args.executar(args)
+    finally:
+        if args.trace:
+            RASTREADOR.desativar()
+            RASTREADOR.exportar_chrome(args.trace)
+            print(f"\nTrace salvo em {args.trace} (job {job})")
+            print(RASTREADOR.resumo())
+
+
+def main(argv=None):
+    args = criar_parser().parse_args(argv)
+    if args.trace or args.profile:
+        executar_instrumentado(args)
+    else:
+        args.executar(args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,28 @@
+import os
+import csv
+
+def gerar_lista(pasta_csv, arquivo_saida="lista_de_musicas.txt"):
+    """Junta os CSV de playlists da pasta numa lista "Artista - Título" sem duplicatas."""
+    # Conjunto para armazenar combinações únicas de "Artista - Título"
+    musicas = set()
+
+    # Percorrer todos os arquivos na pasta
+    for nome_arquivo in os.listdir(pasta_csv):
+        if nome_arquivo.endswith(".csv"):  # Processar apenas arquivos CSV
+            caminho_arquivo = os.path.join(pasta_csv, nome_arquivo)
+            with open(caminho_arquivo, encoding="utf-8") as csvfile:
+                reader = csv.DictReader(csvfile)
+                for row in reader:
+                    # Extrair artista e título
+                    artista = row.get("Artist Name(s)") or row.get("Artist")
+                    titulo = row.get("Track Name") or row.get("Title")
+                    if artista and titulo:
+                        # Adicionar a música ao conjunto para remover duplicatas
+                        musicas.add(f"{artista} - {titulo}")
+
+    # Ordenar as músicas alfabeticamente e salvar no arquivo de saída
+    with open(arquivo_saida, "w", encoding="utf-8") as txtfile:
+        for musica in sorted(musicas):  # A função `sorted` organiza os itens em ordem alfabética
+            txtfile.write(f"{musica}\n")
+
+    print(f"Lista gerada com sucesso e organizada alfabeticamente em '{arquivo_saida}'!")
@@ -0,0 +1,186 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+from .importacao_tardia import importar_tardio
+from .indice_arquivos import IndiceArquivos
+from .padroes import LIMIAR_DUPLICATAS
+
+Image = importar_tardio("PIL.Image")
+
+# Índice persistente de hashes, gravado na pasta processada. A versão muda
+# quando o valor guardado para cada imagem passa a ser calculado de outro jeito.
+NOME_INDICE = ".indice_phash.json"
+VERSAO_INDICE = 2
+
+# Diferença relativa máxima entre as proporções (largura/altura) de duas cópias
+TOLERANCIA_PROPORCAO = 0.03
+
+# Diferença máxima, por canal RGB (0-255), entre as cores médias de duas cópias
+TOLERANCIA_COR = 12
+
+
+def dhash(caminho):
+    """
+    Calcula o dHash de 64 bits de uma imagem.
+
+    Só decodifica o suficiente para uma miniatura: `draft` pede ao decoder
+    JPEG uma versão reduzida e o resto é feito numa imagem 9x8 em tons de cinza.
+    Devolve (hash, largura, altura, cor média RGB) com as dimensões originais;
+    a cor serve de segunda checagem, já que o dHash ignora cor e proporção.
+    """
+    with Image.open(caminho) as img:
+        largura, altura = img.size
+        img.draft('RGB', (64, 64))
+        rgb = img.convert('RGB')
+        cor = list(rgb.resize((1, 1), Image.BOX, reducing_gap=2.0).getpixel((0, 0)))
+        miniatura = rgb.convert('L').resize((9, 8), Image.BILINEAR, reducing_gap=2.0)
+    pixels = list(miniatura.getdata())
+    valor = 0
+    for linha in range(8):
+        for coluna in range(8):
+            esquerda = pixels[linha * 9 + coluna]
+            direita = pixels[linha * 9 + coluna + 1]
+            valor = (valor << 1) | (esquerda > direita)
+    return valor, largura, altura, cor
+
+
+def _dhash_seguro(caminho):
+    try:
+        return caminho, dhash(caminho)
+    except Exception:
+        return caminho, None
+
+
+def distancia(a, b):
+    return bin(a ^ b).count('1')
+
+
+def sem_sinal(valor):
+    """
+    Hash sem informação: imagens chapadas dão 0 e páginas de texto repetem a
+    mesma linha de bits. Esses hashes coincidem entre imagens sem relação.
+    """
+    linhas = valor.to_bytes(8, 'big')
+    return linhas.count(linhas[0]) == 8 or bin(valor).count('1') <= 2 or bin(valor).count('1') >= 62
+
+
+def compativeis(a, b):
+    """Confirma um vizinho da BK-tree: mesma proporção e mesma cor média."""
+    _, largura_a, altura_a, cor_a = a
+    _, largura_b, altura_b, cor_b = b
+    proporcao_a, proporcao_b = largura_a / altura_a, largura_b / altura_b
+    if abs(proporcao_a - proporcao_b) > TOLERANCIA_PROPORCAO * max(proporcao_a, proporcao_b):
+        return False
+    return all(abs(x - y) <= TOLERANCIA_COR for x, y in zip(cor_a, cor_b))
+
+
+class ArvoreBK:
+    """BK-tree sobre a distância de Hamming: busca vizinhos sem comparar todos os pares."""
+
+    def __init__(self):
+        self.raiz = None
+
+    def inserir(self, valor, item):
+        if self.raiz is None:
+            self.raiz = (valor, item, {})
+            return
+        no = self.raiz
+        while True:
+            d = distancia(valor, no[0])
+            filho = no[2].get(d)
+            if filho is None:
+                no[2][d] = (valor, item, {})
+                return
+            no = filho
+
+    def buscar(self, valor, raio):
+        """Devolve os itens a no máximo `raio` bits de distância de `valor`."""
+        encontrados = []
+        pendentes = [self.raiz] if self.raiz else []
+        while pendentes:
+            no = pendentes.pop()
+            d = distancia(valor, no[0])
+            if d <= raio:
+                encontrados.append(no[1])
+            for distancia_filho, filho in no[2].items():
+                if d - raio <= distancia_filho <= d + raio:
+                    pendentes.append(filho)
+        return encontrados
+
+
+class IndiceHashes(IndiceArquivos):
+    """Índice dos dHashes: caminho -> [hash, largura, altura, cor média]."""
+
+    def __init__(self, caminho):
+        super().__init__(caminho, VERSAO_INDICE)
+
+    def obter(self, caminho):
+        valor = super().obter(caminho, os.stat(caminho))
+        return tuple(valor) if valor else None
+
+    def guardar(self, caminho, resultado):
+        super().guardar(caminho, os.stat(caminho), list(resultado))
+
+    def renovar(self, caminho):
+        """
+        Atualiza a assinatura de um arquivo reescrito com a mesma imagem (ex.:
+        depois de remover o EXIF, mesmo com a recompressão do JPEG), para não
+        recalcular o hash.
+        """
+        if os.path.exists(caminho):
+            super().renovar(caminho, os.stat(caminho))
+
+
+def calcular_hashes(caminhos, indice, workers=None):
+    """Devolve {caminho: (hash, largura, altura, cor)}, calculando só o que não está no índice."""
+    resultados, faltando = {}, []
+    for caminho in caminhos:
+        resultado = indice.obter(caminho)
+        if resultado:
+            resultados[caminho] = resultado
+        else:
+            faltando.append(caminho)
+
+    if len(faltando) > 1 and workers != 1:
+        workers = workers or os.cpu_count() or 2
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            calculados = list(executor.map(_dhash_seguro, faltando,
+                                           chunksize=max(1, len(faltando) // (workers * 4))))
+    else:
+        calculados = [_dhash_seguro(caminho) for caminho in faltando]
+
+    for caminho, resultado in calculados:
+        if resultado:
+            indice.guardar(caminho, resultado)
+            resultados[caminho] = resultado
+    indice.salvar()
+    return resultados
+
+
+def agrupar_duplicatas(caminhos, pasta_indice, limiar=LIMIAR_DUPLICATAS, workers=None):
+    """
+    Agrupa imagens quase idênticas (mesma imagem em outro tamanho ou codificação).
+
+    Devolve só os grupos com mais de uma imagem; o primeiro caminho de cada
+    grupo é o representativo (maior resolução, depois maior arquivo).
+    Imagens com hash sem sinal nunca são agrupadas, e cada vizinho da BK-tree
+    só entra no grupo se tiver a mesma proporção e a mesma cor média.
+    """
+    indice = IndiceHashes(os.path.join(pasta_indice, NOME_INDICE))
+    hashes = calcular_hashes(caminhos, indice, workers)
+    hashes = {caminho: resultado for caminho, resultado in hashes.items() if not sem_sinal(resultado[0])}
+
+    arvore = ArvoreBK()
+    for caminho, (valor, _, _, _) in hashes.items():
+        arvore.inserir(valor, caminho)
+
+    grupos, agrupados = [], set()
+    for caminho, (valor, _, _, _) in hashes.items():
+        if caminho in agrupados:
+            continue
+        grupo = [c for c in arvore.buscar(valor, limiar)
+                 if c not in agrupados and (c == caminho or compativeis(hashes[caminho], hashes[c]))]
+        agrupados.update(grupo)
+        if len(grupo) > 1:
+            grupo.sort(key=lambda c: (hashes[c][1] * hashes[c][2], os.path.getsize(c)), reverse=True)
+            grupos.append(grupo)
+    return grupos
@@ -0,0 +1,140 @@
+import os
+import re
+import time
+import sqlite3
+import threading
+import unicodedata
+
+# Nome do banco de estado, criado dentro da pasta de destino
+NOME_BANCO = ".estado_downloads.sqlite3"
+
+# Extensões de áudio consideradas ao indexar a pasta de destino
+EXTENSOES_AUDIO = (".mp3", ".m4a", ".opus", ".ogg", ".flac")
+
+# Tudo que não é letra ou dígito vira separador na chave normalizada
+NAO_PALAVRA = re.compile(r"[^\w]+")
+
+
+def normalizar_linha(texto):
+    """
+    Normaliza uma linha da lista para servir de chave:
+    sem acentos, minúsculas, sem pontuação e com espaços simples.
+    """
+    if not texto.isascii():
+        texto = unicodedata.normalize("NFKD", texto)
+        texto = "".join(c for c in texto if not unicodedata.combining(c))
+    texto = NAO_PALAVRA.sub(" ", texto.casefold())
+    return " ".join(texto.split())
+
+
+def indexar_pasta(pasta, extensoes=EXTENSOES_AUDIO):
+    """
+    Devolve {nome normalizado: nome do arquivo} dos arquivos já existentes na pasta.
+    Arquivos vazios e ocultos (reservas e saídas parciais do ffmpeg) não contam.
+    """
+    indice = {}
+    if not os.path.isdir(pasta):
+        return indice
+    with os.scandir(pasta) as entradas:
+        for entrada in entradas:
+            if entrada.is_file() and entrada.name.lower().endswith(extensoes) \
+                    and not entrada.name.startswith(".") and entrada.stat().st_size:
+                indice[normalizar_linha(os.path.splitext(entrada.name)[0])] = entrada.name
+    return indice
+
+
+class EstadoDownloads:
+    """
+    Registro persistente (SQLite) de cada linha da lista: status, ID da mídia,
+    URL resolvida e arquivo gerado. Seguro para uso pelas threads do pipeline.
+    """
+
+    def __init__(self, caminho):
+        self.caminho = caminho
+        self.lock = threading.Lock()
+        self.conexao = sqlite3.connect(caminho, check_same_thread=False)
+        self.conexao.execute("PRAGMA journal_mode=WAL")
+        self.conexao.execute("""
+            CREATE TABLE IF NOT EXISTS downloads (
+                chave TEXT PRIMARY KEY,
+                linha TEXT NOT NULL,
+                status TEXT NOT NULL,
+                media_id TEXT,
+                url TEXT,
+                arquivo TEXT,
+                erro TEXT,
+                atualizado_em REAL
+            )
+        """)
+        self.conexao.commit()
+
+    def carregar(self):
+        """Carrega todos os registros de uma vez: {chave: dict}."""
+        with self.lock:
+            cursor = self.conexao.execute(
+                "SELECT chave, linha, status, media_id, url, arquivo, erro FROM downloads")
+            colunas = [c[0] for c in cursor.description]
+            return {linha[0]: dict(zip(colunas, linha)) for linha in cursor}
+
+    def registrar(self, linha, status, media_id=None, url=None, arquivo=None, erro=None):
+        with self.lock:
+            self.conexao.execute(
+                """
+                INSERT INTO downloads (chave, linha, status, media_id, url, arquivo, erro, atualizado_em)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT(chave) DO UPDATE SET
+                    linha = excluded.linha,
+                    status = excluded.status,
+                    media_id = COALESCE(excluded.media_id, downloads.media_id),
+                    url = COALESCE(excluded.url, downloads.url),
+                    arquivo = COALESCE(excluded.arquivo, downloads.arquivo),
+                    erro = excluded.erro,
+                    atualizado_em = excluded.atualizado_em
+                """,
+                (normalizar_linha(linha), linha, status, media_id, url, arquivo, erro, time.time()),
+            )
+            self.conexao.commit()
+
+    def fechar(self):
+        with self.lock:
+            self.conexao.close()
+
+
+def filtrar_pendentes(linhas, estado, indice_pasta):
+    """
+    Separa as linhas que ainda precisam ser processadas.
+
+    Uma linha é pulada quando o estado diz que ela foi concluída e o arquivo
+    ainda está na pasta, ou quando já existe na pasta um áudio com o mesmo nome.
+    Devolve (pendentes, quantidade de puladas); cada pendente já traz a URL
+    resolvida anteriormente, se houver, para dispensar a nova busca.
+    """
+    registros = estado.carregar()
+    arquivos = set(indice_pasta.values())
+    pendentes = []
+    puladas = 0
+    vistas = set()
+
+    for linha in linhas:
+        chave = normalizar_linha(linha)
+        if chave in vistas:
+            continue
+        vistas.add(chave)
+
+        registro = registros.get(chave)
+        if registro and registro["status"] == "ok" and registro["arquivo"] \
+                and os.path.basename(registro["arquivo"]) in arquivos:
+            puladas += 1
+            continue
+        if chave in indice_pasta:
+            estado.registrar(linha, "ok", arquivo=indice_pasta[chave])
+            puladas += 1
+            continue
+
+        item = {"linha": linha}
+        if registro and registro["url"]:
+            item["id"] = registro["media_id"]
+            item["url"] = registro["url"]
+        pendentes.append(item)
+
+    return pendentes, puladas
@@ -0,0 +1,159 @@
+import os
+import subprocess
+from concurrent.futures import ThreadPoolExecutor
+from .padroes import MODOS_AUDIO
+from .rastreamento import span
+
+# Codec do stream -> extensão do arquivo remuxado
+EXTENSOES_ORIGINAIS = {
+    "opus": "opus",
+    "mp4a": "m4a",
+    "aac": "m4a",
+    "vorbis": "ogg",
+    "mp3": "mp3",
+    "flac": "flac",
+}
+
+# Extensão do arquivo baixado -> codec presumido (quando o yt-dlp não informa)
+CODECS_POR_EXTENSAO = {
+    ".webm": "opus",
+    ".opus": "opus",
+    ".m4a": "mp4a",
+    ".mp4": "mp4a",
+    ".ogg": "vorbis",
+    ".mp3": "mp3",
+    ".flac": "flac",
+}
+
+
+def extensao_original(bruto, codec=None):
+    """Extensão para remuxar o áudio sem transcodificar, ou None se não houver."""
+    codec = (codec or CODECS_POR_EXTENSAO.get(os.path.splitext(bruto)[1].lower(), "")).lower()
+    for prefixo, extensao in EXTENSOES_ORIGINAIS.items():
+        if codec.startswith(prefixo):
+            return extensao
+    return None
+
+
+def parametros_saida(bruto, modo="mp3", qualidade="192", codec=None):
+    """
+    Devolve (extensão, argumentos de codec do ffmpeg) para o modo escolhido.
+
+    No modo "original" o stream é copiado sem transcodificação; se o codec não
+    tiver um contêiner conhecido, cai para MP3.
+    """
+    extensao = extensao_original(bruto, codec) if modo == "original" else None
+    if extensao:
+        return extensao, ["-c:a", "copy"]
+    # -threads 1: o paralelismo vem de vários arquivos ao mesmo tempo
+    return "mp3", ["-c:a", "libmp3lame", "-b:a", f"{qualidade}k", "-threads", "1"]
+
+
+def reservar_destino(pasta, nome, extensao):
+    """
+    Cria vazio o primeiro arquivo livre entre "nome.ext", "nome (1).ext"...
+    e devolve o caminho. A criação exclusiva (O_EXCL) impede que dois
+    workers com mídias de mesmo título escolham o mesmo nome.
+    """
+    contador = 0
+    while True:
+        sufixo = f" ({contador})" if contador else ""
+        destino = os.path.join(pasta, f"{nome}{sufixo}.{extensao}")
+        try:
+            os.close(os.open(destino, os.O_CREAT | os.O_EXCL | os.O_WRONLY))
+            return destino
+        except FileExistsError:
+            contador += 1
+
+
+def arquivo_parcial(destino):
+    """
+    Nome temporário onde o ffmpeg escreve até terminar: oculto e com a mesma
+    extensão do destino, para o ffmpeg escolher o formato de saída.
+    """
+    pasta, nome = os.path.split(destino)
+    return os.path.join(pasta, f".parcial-{nome}")
+
+
+def remover_se_existir(*caminhos):
+    for caminho in caminhos:
+        try:
+            os.remove(caminho)
+        except FileNotFoundError:
+            pass
+
+
+def extrair_audio(bruto, pasta, modo="mp3", qualidade="192", codec=None, nome=None):
+    """
+    Extrai o áudio de `bruto` para `pasta` e apaga o arquivo bruto em seguida.
+    O arquivo final se chama `nome` (padrão: o nome do bruto) e nunca
+    sobrescreve um existente. Devolve o caminho gerado.
+    """
+    nome = nome or os.path.splitext(os.path.basename(bruto))[0]
+    extensao, argumentos = parametros_saida(bruto, modo, qualidade, codec)
+    destino = reservar_destino(pasta, nome, extensao)
+    parcial = arquivo_parcial(destino)
+
+    # O destino só recebe o arquivo completo; em qualquer falha (ffmpeg
+    # ausente, erro de conversão, Ctrl-C) a reserva e a saída parcial somem
+    try:
+        with span("encode", arquivo=os.path.basename(bruto), modo=modo):
+            resultado = subprocess.run(
+                ["ffmpeg", "-y", "-loglevel", "error", "-i", bruto, "-vn", "-map_metadata", "0",
+                 *argumentos, parcial],
+                capture_output=True, text=True,
+            )
+        if resultado.returncode != 0:
+            raise RuntimeError(f"FFmpeg erro: {resultado.stderr.strip()[-500:]}")
+        os.replace(parcial, destino)
+    except BaseException:
+        remover_se_existir(parcial, destino)
+        raise
+
+    os.remove(bruto)
+    return destino
+
+
+class PoolExtracao:
+    """
+    Fila de arquivos brutos consumida por `workers` conversões simultâneas.
+
+    Cada conversão roda num processo ffmpeg próprio; as threads do pool só
+    esperam por ele, então N workers ocupam N núcleos sem disputar o GIL.
+    """
+
+    def __init__(self, pasta, modo="mp3", qualidade="192", workers=None):
+        if modo not in MODOS_AUDIO:
+            raise ValueError(f"Modo de extração inválido: {modo} (use {', '.join(MODOS_AUDIO)})")
+        self.pasta = pasta
+        self.modo = modo
+        self.qualidade = qualidade
+        self.executor = ThreadPoolExecutor(max_workers=workers or os.cpu_count() or 2,
+                                           thread_name_prefix="extracao")
+        self.futuros = []
+
+    def enviar(self, bruto, codec=None):
+        """Coloca um arquivo bruto na fila e devolve o Future com o caminho final."""
+        futuro = self.executor.submit(extrair_audio, bruto, self.pasta, self.modo, self.qualidade, codec)
+        self.futuros.append(futuro)
+        return futuro
+
+    def aguardar(self):
+        """Espera a fila esvaziar e devolve (arquivos gerados, erros)."""
+        gerados, erros = [], []
+        for futuro in self.futuros:
+            try:
+                gerados.append(futuro.result())
+            except Exception as e:
+                erros.append(e)
+        self.futuros = []
+        return gerados, erros
+
+    def fechar(self):
+        self.executor.shutdown(wait=True)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.fechar()
@@ -1,7 +1,10 @@
 import os
 import re
-import eyed3
 import shutil
+from .importacao_tardia import importar_tardio
+from .rastreamento import rastreado, span
+
+eyed3 = importar_tardio("eyed3")
 
 def limpar_texto(texto):
     """
@@ -27,6 +30,7 @@ def identificar_artista_titulo(nome_arquivo):
     
     return artista, titulo
 
+@rastreado("id3_pasta", lambda caminho_origem, caminho_destino: {"pasta": caminho_origem})
 def atualizar_tags_e_renomear(caminho_origem, caminho_destino):
     # Verifica se as pastas existem
     if not os.path.isdir(caminho_origem):
@@ -38,7 +42,9 @@ def atualizar_tags_e_renomear(caminho_origem, caminho_destino):
         os.makedirs(caminho_destino)
 
     # Processa os arquivos MP3
-    for arquivo in os.listdir(caminho_origem):
+    with span("walk", pasta=caminho_origem):
+        arquivos = os.listdir(caminho_origem)
+    for arquivo in arquivos:
         if arquivo.endswith(".mp3"):
             caminho_arquivo_origem = os.path.join(caminho_origem, arquivo)
 
@@ -47,7 +53,8 @@ def atualizar_tags_e_renomear(caminho_origem, caminho_destino):
                 artista, titulo = identificar_artista_titulo(arquivo)
 
                 # Atualizar tags ID3 usando eyed3
-                audiofile = eyed3.load(caminho_arquivo_origem)
+                with span("id3_load", arquivo=arquivo):
+                    audiofile = eyed3.load(caminho_arquivo_origem)
                 if audiofile is None:
                     print(f"Não foi possível processar '{arquivo}'.")
                     continue
@@ -57,7 +64,8 @@ def atualizar_tags_e_renomear(caminho_origem, caminho_destino):
 
                 audiofile.tag.artist = artista
                 audiofile.tag.title = titulo
-                audiofile.tag.save()
+                with span("id3_save", arquivo=arquivo):
+                    audiofile.tag.save()
 
                 # Definir o novo nome e o caminho na pasta de destino
                 novo_nome = f"{artista} - {titulo}.mp3"
@@ -71,16 +79,9 @@ def atualizar_tags_e_renomear(caminho_origem, caminho_destino):
                     contador += 1
 
                 # Copiar o arquivo renomeado para a pasta de destino
-                shutil.copy2(caminho_arquivo_origem, caminho_arquivo_destino)
+                with span("copy", arquivo=arquivo):
+                    shutil.copy2(caminho_arquivo_origem, caminho_arquivo_destino)
                 print(f"Arquivo renomeado e copiado: {arquivo} -> {novo_nome}")
 
             except Exception as e:
                 print(f"Erro ao processar '{arquivo}': {e}")
-
-# Caminho da pasta de origem (com os arquivos originais)
-caminho_origem = r"C:\Users\Falcon\Desktop\musicas_baixadas"
-
-# Caminho da pasta de destino (onde os arquivos renomeados serão salvos)
-caminho_destino = r"C:\Users\Falcon\Desktop\musicas_id3"
-
-atualizar_tags_e_renomear(caminho_origem, caminho_destino)
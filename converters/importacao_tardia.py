@@ -0,0 +1,52 @@
+import importlib
+
+# Pacote pip de cada dependência opcional, para a mensagem de erro
+PACOTES = {
+    "PIL": "pillow",
+    "yt_dlp": "yt-dlp",
+    "ffmpeg": "ffmpeg-python",
+    "eyed3": "eyed3",
+    "rich": "rich",
+    "tqdm": "tqdm",
+}
+
+
+class ModuloTardio:
+    """
+    Representa um módulo que só é importado no primeiro acesso a um atributo.
+
+    O import passa por `importlib.import_module`, que usa a trava de import do
+    Python; assim várias threads podem fazer o primeiro acesso ao mesmo tempo.
+    """
+
+    def __init__(self, nome):
+        self._nome = nome
+        self._modulo = None
+
+    def _carregar(self):
+        if self._modulo is None:
+            try:
+                self._modulo = importlib.import_module(self._nome)
+            except ModuleNotFoundError as e:
+                raiz = self._nome.split(".")[0]
+                raise ModuleNotFoundError(
+                    f"O módulo '{self._nome}' não está instalado. "
+                    f"Instale com: pip install {PACOTES.get(raiz, raiz)}",
+                    name=self._nome,
+                ) from e
+        return self._modulo
+
+    def __getattr__(self, atributo):
+        return getattr(self._carregar(), atributo)
+
+    def __repr__(self):
+        estado = "carregado" if self._modulo is not None else "não carregado"
+        return f"<módulo tardio '{self._nome}' ({estado})>"
+
+
+def importar_tardio(nome):
+    """
+    Devolve `nome` sem importá-lo ainda. Cada subcomando só paga pelas
+    bibliotecas pesadas (Pillow, yt-dlp, eyed3...) que de fato usar.
+    """
+    return ModuloTardio(nome)
@@ -0,0 +1,66 @@
+import os
+import json
+
+
+class IndiceArquivos:
+    """
+    Cache em disco (JSON) de um valor calculado para cada arquivo, invalidado
+    por tamanho e data de modificação.
+
+    `versao` muda quando o valor guardado passa a ser calculado de outro
+    jeito: um índice de outra versão é descartado inteiro. As chaves são
+    caminhos (absolutos ou relativos, a critério de quem usa).
+    """
+
+    def __init__(self, caminho, versao=1):
+        self.caminho = caminho
+        self.versao = versao
+        self.entradas = {}
+        self.alterado = False
+        if os.path.exists(caminho):
+            try:
+                with open(caminho, encoding="utf-8") as f:
+                    dados = json.load(f)
+                if dados.get("versao") == versao:
+                    self.entradas = dados["entradas"]
+            except (OSError, ValueError, AttributeError, KeyError):
+                self.entradas = {}
+
+    def obter(self, chave, info):
+        """Devolve o valor guardado se `info` (os.stat do arquivo) ainda bate com a assinatura."""
+        entrada = self.entradas.get(chave)
+        if entrada and entrada[0] == info.st_size and entrada[1] == info.st_mtime_ns:
+            return entrada[2]
+        return None
+
+    def guardar(self, chave, info, valor):
+        self.entradas[chave] = [info.st_size, info.st_mtime_ns, valor]
+        self.alterado = True
+
+    def renovar(self, chave, info):
+        """Atualiza só a assinatura de um arquivo reescrito cujo valor não muda."""
+        entrada = self.entradas.get(chave)
+        if entrada:
+            entrada[:2] = [info.st_size, info.st_mtime_ns]
+            self.alterado = True
+
+    def salvar(self, existentes=None):
+        """
+        Grava o índice, se mudou, descartando as entradas de arquivos que não
+        existem mais. `existentes` é o conjunto de chaves atuais; sem ele, as
+        chaves são conferidas no disco (só quando há algo para gravar).
+        """
+        if existentes is None:
+            if not self.alterado:
+                return
+            existentes = {chave for chave in self.entradas if os.path.exists(chave)}
+        if set(self.entradas) - existentes:
+            self.entradas = {c: e for c, e in self.entradas.items() if c in existentes}
+            self.alterado = True
+        if not self.alterado:
+            return
+        temporario = f"{self.caminho}.tmp"
+        with open(temporario, "w", encoding="utf-8") as f:
+            json.dump({"versao": self.versao, "entradas": self.entradas}, f, ensure_ascii=False)
+        os.replace(temporario, self.caminho)
+        self.alterado = False
@@ -0,0 +1,94 @@
+import os
+from .importacao_tardia import importar_tardio
+from .duplicatas_imagem import NOME_INDICE, IndiceHashes, agrupar_duplicatas
+from .padroes import LIMIAR_DUPLICATAS
+from .rastreamento import rastreado
+
+# Carregados só no primeiro uso: uma pasta só de imagens não importa o ffmpeg-python
+tqdm = importar_tardio("tqdm")
+Image = importar_tardio("PIL.Image")
+ffmpeg = importar_tardio("ffmpeg")  # Certifique-se de que FFmpeg esteja instalado e no PATH
+
+EXTENSOES_IMAGEM = ('.jpg', '.jpeg', '.png', '.gif', '.webp')
+
+@rastreado("exif_imagem", lambda caminho: {"arquivo": caminho})
+def limpar_exif_imagem(caminho):
+    """Remove informações EXIF de uma imagem."""
+    try:
+        with Image.open(caminho) as img:
+            data = list(img.getdata())
+            img_no_exif = Image.new(img.mode, img.size)
+            img_no_exif.putdata(data)
+            img_no_exif.save(caminho)
+        return True
+    except Exception as e:
+        print(f"\033[91mErro ao limpar EXIF de {caminho}: {e}\033[0m")
+        return False
+
+@rastreado("exif_video", lambda caminho: {"arquivo": caminho})
+def limpar_exif_video(caminho):
+    """Remove informações EXIF de um vídeo."""
+    try:
+        # Usando ffmpeg para remover metadados
+        output_path = f"{os.path.splitext(caminho)[0]}_no_metadata.mp4"
+        ffmpeg.input(caminho).output(output_path, map_metadata=-1).run(overwrite_output=True)
+        os.replace(output_path, caminho)
+        return True
+    except Exception as e:
+        print(f"\033[91mErro ao limpar EXIF de {caminho}: {e}\033[0m")
+        return False
+
+@rastreado("duplicatas")
+def encontrar_duplicatas(pasta, limiar=LIMIAR_DUPLICATAS):
+    """Pré-passagem por dHash: devolve {duplicata: representativo} das imagens da árvore."""
+    imagens = [
+        os.path.join(root, file)
+        for root, _, files in os.walk(pasta)
+        for file in files if file.lower().endswith(EXTENSOES_IMAGEM)
+    ]
+    duplicatas = {}
+    for grupo in agrupar_duplicatas(imagens, pasta, limiar):
+        for duplicata in grupo[1:]:
+            duplicatas[duplicata] = grupo[0]
+    return duplicatas
+
+@rastreado("processar_pasta", lambda pasta, *_, **__: {"pasta": pasta})
+def processar_pasta(pasta, listar_duplicatas=False, limiar=LIMIAR_DUPLICATAS):
+    """
+    Processa todos os arquivos de imagem e vídeo em uma pasta e subpastas.
+    Com `listar_duplicatas`, também relata as quase duplicatas (todas são limpas).
+    """
+    duplicatas = encontrar_duplicatas(pasta, limiar) if listar_duplicatas else {}
+    limpas = []
+
+    for root, _, files in os.walk(pasta):
+        if not files:
+            continue
+        for file in tqdm.tqdm(files, desc="Processando arquivos", unit="file"):
+            caminho = os.path.join(root, file)
+
+            # Limpar EXIF para imagens
+            if file.lower().endswith(EXTENSOES_IMAGEM):
+                if limpar_exif_imagem(caminho):
+                    limpas.append(caminho)
+                    print(f"\033[92mEXIF limpo: {caminho}\033[0m")
+
+            # Limpar EXIF para vídeos
+            elif file.lower().endswith(('.mp4', '.webm')):
+                if limpar_exif_video(caminho):
+                    print(f"\033[92mMetadados limpos: {caminho}\033[0m")
+
+    if listar_duplicatas:
+        # A limpeza reescreve todos os arquivos e muda a assinatura que o índice
+        # usa. JPEG e WebP são recomprimidos com perdas, mas a diferença fica muito
+        # abaixo do que muda um dHash de 9x8: o hash guardado continua valendo e
+        # a próxima execução não precisa recalcular nenhum
+        indice = IndiceHashes(os.path.join(pasta, NOME_INDICE))
+        for caminho in limpas:
+            indice.renovar(caminho)
+        indice.salvar()
+
+    if duplicatas:
+        print(f"\033[93m{len(duplicatas)} quase duplicatas encontradas (todas foram limpas):\033[0m")
+        for duplicata, representativo in sorted(duplicatas.items()):
+            print(f"\033[93m  {duplicata} = {representativo}\033[0m")
@@ -0,0 +1,198 @@
+import os
+import threading
+import subprocess
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from .importacao_tardia import importar_tardio
+from .padroes import PASTA_DOWNLOADS_AUDIO
+from .extrator_audio import PoolExtracao, arquivo_parcial, parametros_saida, remover_se_existir, reservar_destino
+from .rastreamento import rastreado, span
+
+yt_dlp = importar_tardio('yt_dlp')
+rich_console = importar_tardio('rich.console')
+
+# Tamanho de cada fragmento pedido via HTTP Range ao transmitir para o ffmpeg
+FRAGMENT_SIZE = 1024 * 1024
+
+# Contêineres que o ffmpeg consegue ler de um pipe (sem precisar de seek)
+PIPEABLE_EXTS = {'webm', 'ogg', 'opus', 'mp3', 'aac'}
+
+def build_options(raw_dir, fragments):
+    return {
+        'format': 'bestaudio/best',
+        'outtmpl': os.path.join(raw_dir, '%(title)s.%(ext)s'),
+        'concurrent_fragment_downloads': fragments,
+        'quiet': True,
+        'no_warnings': True,
+        'noprogress': True,
+    }
+
+def can_pipe(info):
+    """Formatos HTTP simples em contêiner lido sequencialmente vão direto para o stdin do ffmpeg."""
+    if info.get('protocol') not in ('http', 'https'):
+        return False
+    return info.get('ext') in PIPEABLE_EXTS or str(info.get('container', '')).endswith('_dash')
+
+def iter_entries(info):
+    """Achata playlists (inclusive aninhadas) em vídeos individuais."""
+    if info.get('_type') in ('playlist', 'multi_video'):
+        for entry in info.get('entries') or []:
+            if entry:
+                yield from iter_entries(entry)
+    else:
+        yield info
+
+def stream_to_ffmpeg(ydl, info, stdin, fragments):
+    """
+    Baixa o áudio e escreve no stdin do ffmpeg, sem arquivo intermediário.
+
+    Se o servidor aceitar HTTP Range, `fragments` pedaços são baixados em
+    paralelo e escritos em ordem; senão, a resposta é lida sequencialmente.
+    """
+    url, headers = info['url'], info.get('http_headers') or {}
+
+    Request = yt_dlp.networking.Request
+
+    def fetch(start, end):
+        request = Request(url, headers={**headers, 'Range': f'bytes={start}-{end}'})
+        with ydl.urlopen(request) as response:
+            return response.read()
+
+    first = ydl.urlopen(Request(url, headers={**headers, 'Range': f'bytes=0-{FRAGMENT_SIZE - 1}'}))
+    content_range = first.headers.get('Content-Range', '')
+    total = content_range.rpartition('/')[2]
+    if first.status != 206 or not total.isdigit():
+        # Sem suporte a Range: transmite a resposta inteira em blocos
+        with first:
+            while chunk := first.read(FRAGMENT_SIZE):
+                stdin.write(chunk)
+        return
+
+    with first:
+        stdin.write(first.read())
+    total = int(total)
+    ranges = [(start, min(start + FRAGMENT_SIZE, total) - 1) for start in range(FRAGMENT_SIZE, total, FRAGMENT_SIZE)]
+    with ThreadPoolExecutor(max_workers=fragments) as executor:
+        # Janela limitada: no máximo 2x `fragments` pedaços em memória
+        window = []
+        for start, end in ranges:
+            window.append(executor.submit(fetch, start, end))
+            if len(window) >= fragments * 2:
+                stdin.write(window.pop(0).result())
+        for future in window:
+            stdin.write(future.result())
+
+@rastreado('pipe', lambda ydl, info, *_: {'arquivo': info.get('title')})
+def pipe_entry(ydl, info, output_dir, modo, fragments):
+    """Transmite uma entrada direto para o ffmpeg e devolve o arquivo gerado."""
+    name = os.path.splitext(os.path.basename(ydl.prepare_filename(info)))[0]
+    ext, codec_args = parametros_saida(f"{name}.{info.get('ext')}", modo, '320', info.get('acodec'))
+    # Nome livre reservado (mesmo título de outra entrada ou arquivo antigo
+    # não é sobrescrito); o ffmpeg escreve num parcial renomeado no fim
+    output_path = reservar_destino(output_dir, name, ext)
+    partial_path = arquivo_parcial(output_path)
+
+    try:
+        process = subprocess.Popen(
+            ['ffmpeg', '-y', '-loglevel', 'error', '-i', 'pipe:0', '-vn', *codec_args, partial_path],
+            stdin=subprocess.PIPE, stderr=subprocess.PIPE,
+        )
+        try:
+            stream_to_ffmpeg(ydl, info, process.stdin, fragments)
+        except BrokenPipeError:
+            pass  # ffmpeg encerrou antes; o erro dele é reportado abaixo
+        except BaseException:
+            process.kill()
+            raise
+        finally:
+            try:
+                process.stdin.close()
+            except BrokenPipeError:
+                pass
+            stderr = process.stderr.read().decode(errors='replace')
+            process.wait()
+        if process.returncode != 0:
+            raise RuntimeError(f"FFmpeg erro: {stderr.strip()[-500:]}")
+        os.replace(partial_path, output_path)
+    except BaseException:
+        remover_se_existir(partial_path, output_path)
+        raise
+    return output_path
+
+def download_batch(urls, modo="mp3", workers=None, fragments=4, parallel=2, output_dir=None):
+    """
+    Baixa o áudio de uma lista de URLs (vídeos ou playlists).
+
+    Formatos transmissíveis são baixados em fragmentos paralelos e enviados
+    direto ao stdin do ffmpeg; os demais (HLS/DASH fragmentado, MP4 comum)
+    são baixados com `concurrent_fragment_downloads` e extraídos no pool.
+    Devolve (arquivos gerados nesta execução, erros).
+    """
+    console = rich_console.Console()
+    output_dir = output_dir or os.path.join(os.getcwd(), PASTA_DOWNLOADS_AUDIO)
+    raw_dir = os.path.join(output_dir, ".brutos")
+    os.makedirs(raw_dir, exist_ok=True)
+    options = build_options(raw_dir, fragments)
+
+    # Uma instância do yt-dlp por thread
+    local = threading.local()
+
+    def get_ydl():
+        if not hasattr(local, 'ydl'):
+            local.ydl = yt_dlp.YoutubeDL(options)
+            local.ydl.add_post_hook(pool.enviar)
+            instances.append(local.ydl)
+        return local.ydl
+
+    def process(info):
+        ydl = get_ydl()
+        if can_pipe(info):
+            return pipe_entry(ydl, info, output_dir, modo, fragments)
+        with span('download', arquivo=info.get('title')):
+            ydl.process_info(info)  # o post hook manda o arquivo para o pool
+        return None
+
+    files, errors, instances = [], [], []
+    console.print("[bold cyan]Iniciando o download do áudio...[/bold cyan]")
+    with PoolExtracao(output_dir, modo=modo, qualidade='320', workers=workers) as pool:
+        with ThreadPoolExecutor(max_workers=parallel) as executor:
+            futures = {}
+            for url in urls:
+                try:
+                    with span('extract_info', arquivo=url):
+                        info = get_ydl().extract_info(url, download=False)
+                except Exception as e:
+                    errors.append(f"{url}: {e}")
+                    continue
+                for entry in iter_entries(info):
+                    futures[executor.submit(process, entry)] = entry.get('title') or url
+
+            for future in as_completed(futures):
+                try:
+                    path = future.result()
+                except Exception as e:
+                    errors.append(f"{futures[future]}: {e}")
+                    continue
+                if path:
+                    files.append(path)
+                    console.print(f"[green]✓ {futures[future]}[/green]")
+
+        extracted, extract_errors = pool.aguardar()
+        files.extend(extracted)
+        errors.extend(str(e) for e in extract_errors)
+
+    for ydl in instances:
+        ydl.close()
+    return files, errors
+
+def download_audio(urls, modo="mp3", workers=None, fragments=4, parallel=2, output_dir=None):
+    console = rich_console.Console()
+    files, errors = download_batch(urls, modo, workers, fragments, parallel, output_dir)
+    for error in errors:
+        console.print(f"[bold red]Erro: {error}[/bold red]")
+    console.print("[bold green]Download concluído![/bold green]")
+    show_saved_files(files, console)
+
+def show_saved_files(files, console):
+    console.print("\n[bold blue]Arquivos salvos:[/bold blue]")
+    for file in sorted(files):
+        console.print(f"[green]{file}[/green]")
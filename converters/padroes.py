@@ -0,0 +1,38 @@
+"""
+Valores padrão compartilhados pela CLI e pelos módulos de cada subcomando.
+
+Este módulo não importa nada pesado: a CLI o usa para montar o --help sem
+carregar os conversores, e os conversores o usam para não repetir os valores.
+"""
+
+import os
+
+# Pastas de saída padrão: `webp` e `webm` criam a sua dentro da pasta de
+# origem; `audio` baixa para esta pasta no diretório atual
+PASTA_IMAGENS_CONVERTIDAS = "convertidas"
+PASTA_VIDEOS_CONVERTIDOS = "convertidos_mp4"
+PASTA_DOWNLOADS_AUDIO = "downloads"
+
+# Modos de extração de áudio:
+#   mp3      - transcodifica para MP3 (libmp3lame)
+#   original - mantém o stream baixado (Opus/AAC/...) e só troca o contêiner
+MODOS_AUDIO = ("mp3", "original")
+
+# Formatos de destino do webp_converter (as chaves de webp_converter.FORMATOS)
+FORMATOS_IMAGEM = ("jpeg", "png", "tiff", "webp")
+
+# Distância de Hamming máxima (em 64 bits) para considerar duas imagens iguais
+LIMIAR_DUPLICATAS = 6
+
+# Cache de buscas compartilhado por todas as listas/pastas de destino ("~" ainda
+# não expandido, para aparecer assim no --help) e validade de cada resultado
+CACHE_BUSCAS = os.path.join("~", ".cache", "python-converters", "buscas.sqlite3")
+DIAS_CACHE_BUSCAS = 30
+
+# Similaridade (Dice dos trigramas) mínima para aceitar uma faixa com outro título
+LIMIAR_SIMILARIDADE = 0.6
+
+# Linhas sem casamento exato que passam pela busca aproximada do reconcile
+# (0 = todas). Numa biblioteca de 30 mil faixas a busca custa ~0,6 s para
+# montar o índice de trigramas e mais ~1 ms por linha
+MAXIMO_APROXIMADAS = 1000
@@ -0,0 +1,207 @@
+"""
+Instrumentação leve das etapas dos conversores.
+
+    from .rastreamento import span, rastreado
+
+    with span("encode", arquivo=nome):
+        ...
+
+    @rastreado("probe", lambda self, caminho: {"arquivo": caminho.name})
+    def get_video_info(self, caminho): ...
+
+Desativado (o padrão), `span` devolve sempre o mesmo objeto nulo e o custo
+é uma chamada de função. Ativado pelo `--trace` do CLI, cada span vira um
+evento no formato Chrome trace (chrome://tracing ou https://ui.perfetto.dev)
+e entra na tabela de resumo por etapa.
+"""
+
+import os
+import time
+import functools
+import threading
+from datetime import datetime
+
+
+class _SpanNulo:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NULO = _SpanNulo()
+
+
+class _Span:
+    __slots__ = ("rastreador", "nome", "tags", "inicio")
+
+    def __init__(self, rastreador, nome, tags):
+        self.rastreador = rastreador
+        self.nome = nome
+        self.tags = tags
+
+    def __enter__(self):
+        self.inicio = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, tipo, *_):
+        duracao = time.perf_counter_ns() - self.inicio
+        if tipo is not None:
+            self.tags["erro"] = tipo.__name__
+        self.rastreador.registrar(self.nome, self.inicio, duracao, self.tags)
+        return False
+
+
+class Rastreador:
+    """Coleta os spans de todas as threads do processo."""
+
+    def __init__(self):
+        self.ativo = False
+        self.job = None
+        self.eventos = []
+        self.threads = {}
+        self.origem = 0
+
+    def ativar(self, job=None):
+        self.ativo = True
+        self.job = job or datetime.now().strftime("%Y%m%d_%H%M%S")
+        self.eventos = []
+        self.threads = {}
+        self.origem = time.perf_counter_ns()
+
+    def desativar(self):
+        self.ativo = False
+
+    def span(self, nome, **tags):
+        if not self.ativo:
+            return _NULO
+        return _Span(self, nome, tags)
+
+    def registrar(self, nome, inicio, duracao, tags):
+        tid = threading.get_ident()
+        if tid not in self.threads:
+            self.threads[tid] = threading.current_thread().name
+        # list.append é atômico no CPython: dispensa trava
+        self.eventos.append((nome, inicio, duracao, tid, tags))
+
+    def exportar_chrome(self, caminho):
+        """Grava os eventos no formato JSON do Chrome trace."""
+        import json
+
+        pid = os.getpid()
+        eventos = [
+            {"name": "thread_name", "ph": "M", "pid": pid, "tid": tid, "args": {"name": nome}}
+            for tid, nome in self.threads.items()
+        ]
+        for nome, inicio, duracao, tid, tags in self.eventos:
+            eventos.append({
+                "name": nome,
+                "cat": "converters",
+                "ph": "X",
+                "ts": (inicio - self.origem) / 1000,
+                "dur": duracao / 1000,
+                "pid": pid,
+                "tid": tid,
+                "args": {"job": self.job, **{k: str(v) for k, v in tags.items()}},
+            })
+        os.makedirs(os.path.dirname(caminho) or ".", exist_ok=True)
+        with open(caminho, "w", encoding="utf-8") as f:
+            json.dump({"traceEvents": eventos, "displayTimeUnit": "ms"}, f)
+
+    def resumo(self):
+        """Tabela por etapa: chamadas, tempo total, média, p95 e máximo."""
+        por_etapa = {}
+        for nome, _, duracao, _, _ in self.eventos:
+            por_etapa.setdefault(nome, []).append(duracao / 1e6)
+        if not por_etapa:
+            return "Nenhum span registrado."
+
+        linhas = [f"{'Etapa':<20} {'Chamadas':>8} {'Total (s)':>10} {'Média (ms)':>11} "
+                  f"{'p95 (ms)':>10} {'Máx (ms)':>10}"]
+        for nome, tempos in sorted(por_etapa.items(), key=lambda item: -sum(item[1])):
+            tempos.sort()
+            p95 = tempos[min(len(tempos) - 1, int(len(tempos) * 0.95))]
+            linhas.append(f"{nome:<20} {len(tempos):>8} {sum(tempos) / 1000:>10.2f} "
+                          f"{sum(tempos) / len(tempos):>11.1f} {p95:>10.1f} {tempos[-1]:>10.1f}")
+        return "\n".join(linhas)
+
+
+RASTREADOR = Rastreador()
+span = RASTREADOR.span
+
+
+def rastreado(nome, tags=None):
+    """Decorador: registra cada chamada da função como um span `nome`."""
+    def decorador(funcao):
+        @functools.wraps(funcao)
+        def envoltorio(*args, **kwargs):
+            if not RASTREADOR.ativo:
+                return funcao(*args, **kwargs)
+            with RASTREADOR.span(nome, **(tags(*args, **kwargs) if tags else {})):
+                return funcao(*args, **kwargs)
+        return envoltorio
+    return decorador
+
+
+def executar_com_perfil(funcao, prefixo):
+    """
+    Executa `funcao()` sob cProfile e tracemalloc e salva `<prefixo>.prof`
+    (abrir com `python -m pstats` ou snakeviz) e `<prefixo>.memoria.txt`.
+    `prefixo` também pode ser uma função, chamada só na hora de salvar.
+
+    Cada thread criada durante a execução ganha o seu próprio perfil, somado
+    ao da thread principal no .prof. Processos filhos (os pools do webp e do
+    exif) não entram no perfil.
+    """
+    # Importados aqui para não pesar na inicialização quando não há --profile
+    import sys
+    import pstats
+    import cProfile
+    import tracemalloc
+
+    perfis = []
+
+    def perfilar_thread(*_):
+        # Primeiro evento da thread nova: troca este gancho pelo cProfile
+        perfil = cProfile.Profile()
+        try:
+            perfil.enable()
+        except ValueError:
+            # Python 3.12+: o perfil da thread principal já vê todas as threads
+            sys.setprofile(None)
+            return
+        perfis.append(perfil)
+
+    perfil = cProfile.Profile()
+    tracemalloc.start()
+    threading.setprofile(perfilar_thread)
+    try:
+        perfil.runcall(funcao)
+    finally:
+        threading.setprofile(None)
+        atual, pico = tracemalloc.get_traced_memory()
+        estatisticas = tracemalloc.take_snapshot().statistics("lineno")
+        tracemalloc.stop()
+
+        resultado = pstats.Stats(perfil)
+        for perfil_thread in perfis:
+            try:
+                resultado.add(perfil_thread)
+            except TypeError:
+                pass  # thread que não chegou a chamar nada depois de ligar o perfil
+
+        if callable(prefixo):
+            prefixo = prefixo()
+        os.makedirs(os.path.dirname(prefixo) or ".", exist_ok=True)
+        resultado.dump_stats(f"{prefixo}.prof")
+        with open(f"{prefixo}.memoria.txt", "w", encoding="utf-8") as f:
+            f.write(f"Memória atual: {atual / 1024:.0f} KiB | pico: {pico / 1024:.0f} KiB\n\n")
+            for estatistica in estatisticas[:30]:
+                f.write(f"{estatistica}\n")
+
+        print(f"\nPerfil salvo em {prefixo}.prof e {prefixo}.memoria.txt "
+              f"(thread principal + {len(perfis)} threads)")
+        resultado.sort_stats("cumulative").print_stats(15)
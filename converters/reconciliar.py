@@ -0,0 +1,412 @@
+"""
+Reconciliação da lista de músicas com a biblioteca local (ex.: musicas_id3).
+
+Cada linha "Artista - Título" da lista é procurada primeiro por chaves
+normalizadas exatas e depois, se não houver, num índice de trigramas.
+O artista e o título das faixas vêm das tags ID3, lidas só do cabeçalho
+de cada arquivo e guardadas num índice em disco para as próximas execuções.
+"""
+
+import os
+import json
+import math
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from .estado_downloads import EXTENSOES_AUDIO, normalizar_linha
+from .indice_arquivos import IndiceArquivos
+from .id3tags_rename_mp3 import identificar_artista_titulo, limpar_texto
+from .padroes import LIMIAR_SIMILARIDADE, MAXIMO_APROXIMADAS
+from .rastreamento import span
+
+# Índice das tags, criado dentro da pasta da biblioteca. A versão muda
+# quando as chaves guardadas nele passam a ser calculadas de outro jeito.
+NOME_INDICE = ".indice_id3.json"
+VERSAO_INDICE = 2
+
+# Memória máxima (bytes) das máscaras de trigramas guardadas durante a busca aproximada
+MEMORIA_MASCARAS = 64 * 1024 * 1024
+
+# Quadros de texto usados (ID3v2.3/2.4 e os nomes curtos do ID3v2.2)
+QUADROS = {b"TPE1": "artista", b"TIT2": "titulo", b"TP1": "artista", b"TT2": "titulo"}
+CODIFICACOES = {0: "latin-1", 1: "utf-16", 2: "utf-16-be", 3: "utf-8"}
+
+
+def _syncsafe(dados):
+    return (dados[0] << 21) | (dados[1] << 14) | (dados[2] << 7) | dados[3]
+
+
+def _texto(dados):
+    """Decodifica um quadro de texto; vários valores (ID3v2.4) viram "a, b"."""
+    if not dados:
+        return ""
+    texto = dados[1:].decode(CODIFICACOES.get(dados[0], "latin-1"), errors="replace")
+    return ", ".join(p.strip(" \ufeff") for p in texto.split("\x00") if p.strip(" \ufeff"))
+
+
+def ler_id3v2(arquivo):
+    """
+    Lê TPE1/TIT2 do cabeçalho ID3v2 pulando os demais quadros com seek,
+    sem carregar capas nem o áudio.
+    """
+    cabecalho = arquivo.read(10)
+    if len(cabecalho) < 10 or cabecalho[:3] != b"ID3" or cabecalho[3] not in (2, 3, 4):
+        return {}
+    versao, flags = cabecalho[3], cabecalho[5]
+    fim = 10 + _syncsafe(cabecalho[6:10])
+
+    if flags & 0x40 and versao > 2:
+        # Cabeçalho estendido: no 2.4 o tamanho inclui os 4 bytes do campo
+        tamanho = arquivo.read(4)
+        extra = _syncsafe(tamanho) - 4 if versao == 4 else int.from_bytes(tamanho, "big")
+        arquivo.seek(extra, os.SEEK_CUR)
+
+    tamanho_id, tamanho_quadro = (3, 6) if versao == 2 else (4, 10)
+    tags = {}
+    posicao = arquivo.tell()
+    while posicao + tamanho_quadro <= fim and len(tags) < 2:
+        quadro = arquivo.read(tamanho_quadro)
+        if len(quadro) < tamanho_quadro or quadro[0] == 0:
+            break  # padding
+        if versao == 2:
+            tamanho = int.from_bytes(quadro[3:6], "big")
+        elif versao == 4:
+            tamanho = _syncsafe(quadro[4:8])
+        else:
+            tamanho = int.from_bytes(quadro[4:8], "big")
+
+        campo = QUADROS.get(quadro[:tamanho_id])
+        if campo and campo not in tags:
+            tags[campo] = _texto(arquivo.read(tamanho))
+        else:
+            arquivo.seek(tamanho, os.SEEK_CUR)
+        posicao += tamanho_quadro + tamanho
+    return tags
+
+
+def ler_id3v1(arquivo):
+    """Lê o bloco ID3v1 dos últimos 128 bytes do arquivo."""
+    arquivo.seek(-128, os.SEEK_END)
+    dados = arquivo.read(128)
+    if dados[:3] != b"TAG":
+        return {}
+    campos = {"titulo": dados[3:33], "artista": dados[33:63]}
+    tags = {}
+    for campo, valor in campos.items():
+        valor = valor.split(b"\x00")[0].decode("latin-1").strip()
+        if valor:
+            tags[campo] = valor
+    return tags
+
+
+def ler_tags(caminho):
+    """
+    Devolve (artista, título) do arquivo: ID3v2, depois ID3v1 e, na falta
+    das tags, o nome do arquivo no formato "Artista - Título".
+    """
+    tags = {}
+    try:
+        with open(caminho, "rb") as arquivo:
+            tags = ler_id3v2(arquivo)
+            if len(tags) < 2:
+                tags = {**ler_id3v1(arquivo), **tags}
+    except (OSError, ValueError):
+        pass
+    if not (tags.get("artista") and tags.get("titulo")):
+        artista, titulo = identificar_artista_titulo(os.path.basename(caminho))
+        tags.setdefault("artista", artista)
+        tags.setdefault("titulo", titulo)
+    return tags["artista"], tags["titulo"]
+
+
+def _listar_audios(pasta):
+    """Percorre a pasta (e subpastas) devolvendo (caminho, stat) de cada arquivo de áudio."""
+    with os.scandir(pasta) as entradas:
+        for entrada in entradas:
+            if entrada.is_dir(follow_symlinks=False):
+                yield from _listar_audios(entrada.path)
+            elif entrada.is_file() and entrada.name.lower().endswith(EXTENSOES_AUDIO):
+                yield entrada.path, entrada.stat()
+
+
+def indexar_biblioteca(pasta, workers=None):
+    """
+    Devolve [(arquivo relativo, artista, título, chaves)] das faixas da pasta.
+    Só os arquivos novos ou alterados desde a última execução são abertos.
+    """
+    indice = IndiceArquivos(os.path.join(pasta, NOME_INDICE), VERSAO_INDICE)
+    faixas, faltando = [], []
+    prefixo = len(os.path.join(pasta, ""))
+    for caminho, info in _listar_audios(pasta):
+        relativo = caminho[prefixo:]
+        faixa = indice.obter(relativo, info)
+        if faixa:
+            faixas.append((relativo, *faixa))
+        else:
+            faltando.append((caminho, relativo, info))
+
+    if faltando:
+        # Leitura de cabeçalhos é E/S pura: threads bastam
+        with ThreadPoolExecutor(max_workers=workers or min(32, (os.cpu_count() or 2) * 4)) as executor:
+            lidas = executor.map(ler_tags, [caminho for caminho, _, _ in faltando])
+            for (_, relativo, info), (artista, titulo) in zip(faltando, lidas):
+                faixa = (artista, titulo, chaves(artista, titulo))
+                indice.guardar(relativo, info, list(faixa))
+                faixas.append((relativo, *faixa))
+
+    indice.salvar({faixa[0] for faixa in faixas})
+    return faixas
+
+
+def separar(linha):
+    """Divide "Artista - Título" da lista (sem tratar pontos como extensão)."""
+    artista, separador, titulo = linha.partition(" - ")
+    return (artista, titulo) if separador else ("", linha)
+
+
+def chaves(artista, titulo):
+    """
+    Chaves normalizadas de uma faixa, da mais fiel à mais solta: como está,
+    sem trechos entre parênteses/colchetes e só com o primeiro artista.
+    """
+    # Só normaliza de novo quando a variante difere da anterior
+    completa = limpa = normalizar_linha(f"{artista} {titulo}")
+    if "(" in artista or "[" in artista or "(" in titulo or "[" in titulo:
+        artista, titulo = limpar_texto(artista), limpar_texto(titulo)
+        limpa = normalizar_linha(f"{artista} {titulo}")
+    primeiro = normalizar_linha(f"{artista.split(',')[0]} {titulo}") if "," in artista else limpa
+    return [completa, limpa, primeiro]
+
+
+def trigramas(chave):
+    chave = f"  {chave} "
+    return {chave[i:i + 3] for i in range(len(chave) - 2)}
+
+
+class Biblioteca:
+    """
+    Índices da biblioteca: chaves exatas, grupos de duplicatas e trigramas.
+    O índice de trigramas só é montado se alguma linha não casar exatamente.
+    """
+
+    def __init__(self, faixas):
+        self.faixas = faixas
+        self.exatas = {}
+        self.grupos = {}
+        self.posicoes = None
+        self.postagens = None
+        self.mascaras = None
+        for posicao, (_, _, _, alternativas) in enumerate(faixas):
+            for chave in alternativas:
+                if chave:
+                    self.exatas.setdefault(chave, posicao)
+            # A chave sem parênteses junta "Faixa.mp3" e "Faixa (1).mp3"
+            if alternativas[1]:
+                self.grupos.setdefault(alternativas[1], []).append(posicao)
+
+    def _indexar_trigramas(self, ignorar):
+        """
+        Indexa só as faixas ainda não casadas: as demais nunca seriam candidatas.
+        Cada faixa indexada ganha um bit; `posicoes` leva do bit à faixa.
+
+        Os trigramas saem direto do texto, sem montar um conjunto por faixa (um
+        trigrama repetido só repete o bit, o que a máscara absorve); o conjunto
+        é calculado depois, só para as faixas que chegam a ser pontuadas.
+        """
+        self.posicoes, self.mascaras = [], {}
+        postagens = defaultdict(list)
+        for posicao, faixa in enumerate(self.faixas):
+            if posicao in ignorar:
+                continue
+            bit = len(self.posicoes)
+            self.posicoes.append(posicao)
+            texto = f"  {faixa[3][1]} "
+            for i in range(len(texto) - 2):
+                postagens[texto[i:i + 3]].append(bit)
+        self.postagens = postagens
+
+    def _mascara(self, trigrama):
+        """Postagens do trigrama como um inteiro com um bit por faixa."""
+        mascara = self.mascaras.get(trigrama)
+        if mascara is None:
+            bits = self.postagens.get(trigrama)
+            if not bits:
+                return 0
+            dados = bytearray(len(self.posicoes) // 8 + 1)
+            for bit in bits:
+                dados[bit >> 3] |= 1 << (bit & 7)
+            mascara = int.from_bytes(dados, "little")
+            # Máscaras de poucas faixas saem baratas de refazer; as demais
+            # ficam guardadas enquanto couberem em MEMORIA_MASCARAS
+            if len(bits) >= 32 and len(self.mascaras) * len(dados) < MEMORIA_MASCARAS:
+                self.mascaras[trigrama] = mascara
+        return mascara
+
+    def buscar_exata(self, alternativas):
+        for chave in filter(None, alternativas):
+            posicao = self.exatas.get(chave)
+            if posicao is not None:
+                return posicao
+        return None
+
+    def buscar_aproximada(self, chave, limiar=LIMIAR_SIMILARIDADE, ignorar=()):
+        """
+        Faixa mais parecida com `chave` pelo coeficiente de Dice dos trigramas.
+
+        Para Dice >= limiar, uma faixa precisa de pelo menos
+        limiar * n / (2 - limiar) trigramas em comum com a consulta. As
+        máscaras dos n trigramas são somadas bit a bit (um contador binário
+        por faixa, em fatias de inteiros), e só as faixas que atingem esse
+        mínimo chegam a ser pontuadas em Python.
+        """
+        if self.postagens is None:
+            self._indexar_trigramas(ignorar)
+        consulta = trigramas(chave)
+        n = len(consulta)
+        minimo = max(1, math.ceil(limiar * n / (2 - limiar) - 1e-9))
+
+        # niveis[i] guarda o bit i da contagem de cada faixa
+        niveis = []
+        for trigrama in consulta:
+            vai_um = self._mascara(trigrama)
+            for i in range(len(niveis)):
+                if not vai_um:
+                    break
+                niveis[i], vai_um = niveis[i] ^ vai_um, niveis[i] & vai_um
+            if vai_um:
+                niveis.append(vai_um)
+        if minimo.bit_length() > len(niveis):
+            return None
+
+        # Compara a contagem com `minimo`, do bit mais significativo ao menor
+        maior, igual = 0, -1
+        for i in reversed(range(len(niveis))):
+            if minimo >> i & 1:
+                igual &= niveis[i]
+            else:
+                maior |= igual & niveis[i]
+        candidatas = maior | igual
+        if not candidatas:
+            return None
+
+        melhor, pontuacao = None, limiar
+        bits = bin(candidatas)[:1:-1]
+        bit = bits.find("1")
+        while bit >= 0:
+            posicao = self.posicoes[bit]
+            if posicao not in ignorar:
+                conjunto = trigramas(self.faixas[posicao][3][1])
+                dice = 2 * len(consulta & conjunto) / (n + len(conjunto))
+                if dice >= pontuacao:
+                    melhor, pontuacao = posicao, dice
+            bit = bits.find("1", bit + 1)
+        return (melhor, pontuacao) if melhor is not None else None
+
+    def duplicadas(self):
+        return [[self.faixas[p][0] for p in grupo] for grupo in self.grupos.values() if len(grupo) > 1]
+
+
+def reconciliar(linhas, biblioteca, limiar=LIMIAR_SIMILARIDADE, maximo_aproximadas=MAXIMO_APROXIMADAS):
+    """
+    Casa as linhas da lista com a biblioteca. Devolve um dicionário com
+    encontradas, divergentes [(linha, arquivo, similaridade)], faltando,
+    nao_verificadas, duplicadas (grupos de arquivos) e repetidas (linhas
+    repetidas da lista).
+
+    Só as primeiras `maximo_aproximadas` linhas sem casamento exato passam
+    pela busca aproximada (0 = todas); as demais vão para nao_verificadas.
+    """
+    resultado = {"encontradas": [], "divergentes": [], "faltando": [], "nao_verificadas": [], "repetidas": []}
+    pendentes, vistas, usadas = [], set(), set()
+
+    # Passo 1: chaves exatas; as faixas casadas saem da busca aproximada
+    for linha in linhas:
+        alternativas = chaves(*separar(linha))
+        if alternativas[0] in vistas:
+            resultado["repetidas"].append(linha)
+            continue
+        vistas.add(alternativas[0])
+        posicao = biblioteca.buscar_exata(alternativas)
+        if posicao is None:
+            pendentes.append((linha, alternativas[1] or alternativas[0]))
+        else:
+            usadas.add(posicao)
+            resultado["encontradas"].append((linha, biblioteca.faixas[posicao][0]))
+
+    # Passo 2: trigramas para o que sobrou, até o limite
+    if maximo_aproximadas and len(pendentes) > maximo_aproximadas:
+        resultado["nao_verificadas"] = [linha for linha, _ in pendentes[maximo_aproximadas:]]
+        pendentes = pendentes[:maximo_aproximadas]
+    for linha, chave in pendentes:
+        achada = biblioteca.buscar_aproximada(chave, limiar, usadas)
+        if achada:
+            posicao, similaridade = achada
+            usadas.add(posicao)
+            resultado["divergentes"].append((linha, biblioteca.faixas[posicao][0], similaridade))
+        else:
+            resultado["faltando"].append(linha)
+
+    resultado["duplicadas"] = biblioteca.duplicadas()
+    return resultado
+
+
+def salvar_resultado(resultado, pasta_saida):
+    """
+    Grava faltando.txt, divergentes.txt e nao_verificadas.txt (uma música por
+    linha, prontos para o `converters fetch`) e relatorio.tsv com cada caso: a
+    similaridade das divergentes e, nas duplicadas, o arquivo que fica como
+    original.
+    """
+    os.makedirs(pasta_saida, exist_ok=True)
+    caminhos = {nome: os.path.join(pasta_saida, nome)
+                for nome in ("faltando.txt", "divergentes.txt", "nao_verificadas.txt", "relatorio.tsv")}
+
+    with open(caminhos["faltando.txt"], "w", encoding="utf-8") as f:
+        f.writelines(f"{linha}\n" for linha in resultado["faltando"])
+    with open(caminhos["nao_verificadas.txt"], "w", encoding="utf-8") as f:
+        f.writelines(f"{linha}\n" for linha in resultado["nao_verificadas"])
+    with open(caminhos["divergentes.txt"], "w", encoding="utf-8") as f:
+        f.writelines(f"{linha}\n" for linha, _, _ in resultado["divergentes"])
+    with open(caminhos["relatorio.tsv"], "w", encoding="utf-8") as f:
+        f.write("tipo\tlinha\tarquivo\tdetalhe\n")
+        for linha in resultado["faltando"]:
+            f.write(f"faltando\t{linha}\t\t\n")
+        for linha in resultado["nao_verificadas"]:
+            f.write(f"nao_verificada\t{linha}\t\t\n")
+        for linha, arquivo, similaridade in resultado["divergentes"]:
+            f.write(f"divergente\t{linha}\t{arquivo}\t{similaridade:.2f}\n")
+        for grupo in resultado["duplicadas"]:
+            for arquivo in grupo[1:]:
+                f.write(f"duplicada\t\t{arquivo}\t{grupo[0]}\n")
+        for linha in resultado["repetidas"]:
+            f.write(f"repetida\t{linha}\t\t\n")
+    return caminhos
+
+
+def reconciliar_lista(arquivo_txt, pasta_biblioteca, pasta_saida=".", limiar=LIMIAR_SIMILARIDADE, workers=None,
+                      maximo_aproximadas=MAXIMO_APROXIMADAS):
+    """Reconcilia a lista com a biblioteca, grava os resultados e mostra o resumo."""
+    with open(arquivo_txt, "r", encoding="utf-8") as file:
+        linhas = [linha.strip() for linha in file if linha.strip()]
+
+    inicio = time.perf_counter()
+    with span("indexar", pasta=pasta_biblioteca):
+        faixas = indexar_biblioteca(pasta_biblioteca, workers)
+    indexado = time.perf_counter()
+    with span("casar", linhas=len(linhas), faixas=len(faixas)):
+        resultado = reconciliar(linhas, Biblioteca(faixas), limiar, maximo_aproximadas)
+    fim = time.perf_counter()
+
+    caminhos = salvar_resultado(resultado, pasta_saida)
+    print(f"{len(linhas)} linhas x {len(faixas)} faixas "
+          f"(índice {indexado - inicio:.2f}s, casamento {fim - indexado:.2f}s):")
+    print(f"  \033[92m{len(resultado['encontradas'])} encontradas\033[0m")
+    print(f"  \033[93m{len(resultado['divergentes'])} com outro título\033[0m -> {caminhos['divergentes.txt']}")
+    print(f"  \033[91m{len(resultado['faltando'])} faltando\033[0m -> {caminhos['faltando.txt']}")
+    if resultado["nao_verificadas"]:
+        print(f"  \033[93m{len(resultado['nao_verificadas'])} sem busca aproximada\033[0m "
+              f"(limite de {maximo_aproximadas} linhas; --max-aproximadas 0 verifica todas) "
+              f"-> {caminhos['nao_verificadas.txt']}")
+    print(f"  {sum(len(g) - 1 for g in resultado['duplicadas'])} arquivos duplicados na biblioteca, "
+          f"{len(resultado['repetidas'])} linhas repetidas na lista -> {caminhos['relatorio.tsv']}")
+    return resultado
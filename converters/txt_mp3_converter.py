@@ -0,0 +1,332 @@
+import os
+import time
+import queue
+import threading
+from .importacao_tardia import importar_tardio
+from .extrator_audio import extrair_audio
+from .rastreamento import span
+from .estado_downloads import NOME_BANCO, EstadoDownloads, indexar_pasta, filtrar_pendentes
+
+# Só é carregado quando há algo para buscar ou baixar
+yt_dlp = importar_tardio("yt_dlp")
+
+# Qualidade do MP3 gerado (kbps)
+qualidade_mp3 = "192"
+
+# Opções comuns a todas as instâncias do yt-dlp
+ydl_opts_base = {
+    "quiet": True,
+    "no_warnings": True,
+    "noprogress": True,
+}
+
+# Sentinela que encerra os workers de um estágio
+_FIM = object()
+
+
+class ErroDefinitivo(Exception):
+    """Erro que não adianta repetir (ex.: busca sem resultados)."""
+
+
+class Estagio:
+    """
+    Um estágio do pipeline: `workers` threads consumindo a mesma fila.
+
+    Cada worker chama `inicializar()` uma única vez e reaproveita o contexto
+    devolvido (ex.: uma instância de YoutubeDL) para todos os itens que processar.
+    """
+
+    def __init__(self, nome, funcao, workers=1, tentativas=3, espera=2.0,
+                 inicializar=None, finalizar=None):
+        self.nome = nome
+        self.funcao = funcao
+        self.workers = max(1, workers)
+        self.tentativas = max(1, tentativas)
+        self.espera = espera
+        self.inicializar = inicializar
+        self.finalizar = finalizar
+        self.lock = threading.Lock()
+        self.sem_contexto = 0
+
+    def executar(self, contexto, item):
+        """Executa a função do estágio com retentativas e backoff exponencial."""
+        for tentativa in range(1, self.tentativas + 1):
+            try:
+                with span(self.nome, arquivo=item["linha"], tentativa=tentativa):
+                    return self.funcao(contexto, item)
+            except ErroDefinitivo:
+                raise
+            except Exception as e:
+                if tentativa == self.tentativas:
+                    raise
+                atraso = self.espera * 2 ** (tentativa - 1)
+                print(f"[{self.nome}] {item['linha']}: {e} (nova tentativa em {atraso:.0f}s)")
+                time.sleep(atraso)
+
+    def worker(self, entrada, saida, falhas, ao_falhar=None):
+        try:
+            contexto = self.inicializar() if self.inicializar else None
+        except Exception as e:
+            self.descartar(entrada, falhas, ao_falhar, e)
+            return
+        try:
+            while True:
+                item = entrada.get()
+                if item is _FIM:
+                    break
+                try:
+                    saida.put(self.executar(contexto, item))
+                except Exception as e:
+                    self.falhar(item, e, falhas, ao_falhar)
+        finally:
+            if self.finalizar:
+                self.finalizar(contexto)
+
+
+    def falhar(self, item, erro, falhas, ao_falhar=None):
+        print(f"Erro ao baixar {item['linha']} ({self.nome}): {erro}")
+        falhas.append((self.nome, item, erro))
+        if ao_falhar:
+            ao_falhar(self.nome, item, erro)
+
+    def descartar(self, entrada, falhas, ao_falhar, erro):
+        """
+        Chamado quando `inicializar()` falha (ex.: yt-dlp não instalado). Os
+        outros workers seguem consumindo a fila; se nenhum conseguiu iniciar,
+        o último a falhar consome os itens restantes como falhas, para o
+        pipeline nunca ficar com um estágio sem consumidores.
+        """
+        with self.lock:
+            self.sem_contexto += 1
+            ultimo = self.sem_contexto == self.workers
+        print(f"Erro ao iniciar o estágio {self.nome}: {erro}")
+        if not ultimo:
+            return
+        # Consome também as sentinelas dos workers que já saíram
+        restantes = self.workers
+        while restantes:
+            item = entrada.get()
+            if item is _FIM:
+                restantes -= 1
+            else:
+                self.falhar(item, erro, falhas, ao_falhar)
+
+
+class Reservas:
+    """Garante que cada mídia seja baixada uma só vez, mesmo que várias linhas resolvam para ela."""
+
+    def __init__(self):
+        self.donos = {}
+        self.lock = threading.Lock()
+
+    def reservar(self, item):
+        chave = item.get("id") or item["url"]
+        with self.lock:
+            dono = self.donos.setdefault(chave, item["linha"])
+        if dono != item["linha"]:
+            item["duplicada_de"] = dono
+            return False
+        return True
+
+
+def executar_pipeline(itens, estagios, tamanho_fila=16, ao_falhar=None):
+    """
+    Encadeia os estágios por filas limitadas e devolve (concluídos, falhas).
+
+    A fila limitada faz o estágio mais rápido esperar o mais lento, evitando
+    que a busca resolva centenas de músicas antes de o download começar.
+    `ao_falhar(estagio, item, erro)` é chamado assim que um item desiste.
+    """
+    filas = [queue.Queue(maxsize=tamanho_fila) for _ in estagios]
+    filas.append(queue.Queue())  # Saída final (sem limite)
+    falhas = []
+
+    threads = []
+    for i, estagio in enumerate(estagios):
+        grupo = [
+            threading.Thread(target=estagio.worker, args=(filas[i], filas[i + 1], falhas, ao_falhar),
+                             name=f"{estagio.nome}-{n}", daemon=True)
+            for n in range(estagio.workers)
+        ]
+        for thread in grupo:
+            thread.start()
+        threads.append(grupo)
+
+    for item in itens:
+        filas[0].put(item)
+
+    # Encerra os estágios em ordem: só depois que o estágio i termina é que
+    # o estágio i+1 recebe as sentinelas
+    for i, estagio in enumerate(estagios):
+        for _ in range(estagio.workers):
+            filas[i].put(_FIM)
+        for thread in threads[i]:
+            thread.join()
+
+    concluidos = []
+    while not filas[-1].empty():
+        concluidos.append(filas[-1].get())
+    return concluidos, falhas
+
+
+def criar_ydl(opcoes=None):
+    """Cria uma instância do yt-dlp; substituível por um extrator local nos testes."""
+    return yt_dlp.YoutubeDL({**ydl_opts_base, **(opcoes or {})})
+
+
+def fechar_ydl(ydl):
+    ydl.close()
+
+
+def resolver_musica(ydl, item, cache=None):
+    """
+    Estágio 1: resolve a linha da lista para a URL do primeiro resultado.
+    Consultas presentes no `cache` não passam pela busca.
+    """
+    consulta = item["linha"]
+    if item.get("url"):
+        # URL já resolvida numa execução anterior
+        return item
+    if consulta.startswith(("http://", "https://")):
+        # Linhas que já são URLs dispensam a busca
+        item["url"] = consulta
+        return item
+
+    if cache:
+        resultado = cache.obter(consulta)
+        if resultado:
+            item["id"], item["url"] = resultado
+            return item
+
+    # process=False devolve só a lista de resultados, sem extrair cada vídeo
+    inicio = time.perf_counter()
+    info = ydl.extract_info(f"ytsearch1:{consulta}", download=False, process=False)
+    entrada = next(iter(info.get("entries") or []), None)
+    if not entrada:
+        raise ErroDefinitivo("nenhum resultado encontrado")
+    item["id"] = entrada.get("id")
+    item["url"] = entrada.get("url") or entrada.get("webpage_url")
+    if cache:
+        cache.guardar(consulta, item["id"], item["url"], time.perf_counter() - inicio)
+    return item
+
+
+def baixar_audio_bruto(ydl, item):
+    """Estágio 2: baixa o melhor áudio disponível, sem pós-processamento."""
+    print(f"Baixando: {item['linha']}")
+    info = ydl.extract_info(item["url"], download=True)
+    item["id"] = info.get("id", item.get("id"))
+    item["titulo"] = info.get("title")
+    baixados = info.get("requested_downloads") or []
+    item["bruto"] = baixados[0]["filepath"] if baixados else ydl.prepare_filename(info)
+    item["codec"] = (baixados[0] if baixados else info).get("acodec")
+    return item
+
+
+def extrair_item(pasta, modo, qualidade, item):
+    """Estágio 3: transcodifica (ou remuxa) o áudio bruto; o bruto é apagado logo em seguida."""
+    # O bruto leva o ID ("Título [id].webm") para mídias de mesmo título não
+    # colidirem; o arquivo final fica só com o título
+    nome = os.path.splitext(os.path.basename(item["bruto"]))[0]
+    sufixo = f" [{item.get('id')}]"
+    if nome.endswith(sufixo):
+        nome = nome[:-len(sufixo)]
+    item["arquivo"] = extrair_audio(item["bruto"], pasta, modo, qualidade, item.get("codec"), nome)
+    return item
+
+
+def registrar_concluida(estado, item):
+    estado.registrar(item["linha"], "ok", item.get("id"), item.get("url"), item["arquivo"])
+    return item
+
+
+def baixar_lista(arquivo_txt, pasta_destino, workers_busca=4, workers_download=3,
+                 workers_extracao=None, tentativas=3, qualidade=qualidade_mp3,
+                 fabrica_ydl=criar_ydl, refazer=False, modo="mp3", cache=None):
+    """
+    Lê a lista de músicas e processa cada linha pelo pipeline busca → download → extração.
+
+    Linhas já concluídas em execuções anteriores (ou cujo MP3 já está na pasta)
+    são puladas, a menos que `refazer` seja True. Com `modo="original"` o
+    áudio baixado é só remuxado, sem transcodificar para MP3. `cache` é um
+    CacheBusca opcional consultado antes de cada ytsearch.
+    """
+    pasta_brutos = os.path.join(pasta_destino, ".brutos")
+    os.makedirs(pasta_brutos, exist_ok=True)
+
+    with open(arquivo_txt, "r", encoding="utf-8") as file:
+        linhas = [linha.strip() for linha in file if linha.strip()]
+
+    estado = EstadoDownloads(os.path.join(pasta_destino, NOME_BANCO))
+    if refazer:
+        pendentes, puladas = [{"linha": linha} for linha in dict.fromkeys(linhas)], 0
+    else:
+        pendentes, puladas = filtrar_pendentes(linhas, estado, indexar_pasta(pasta_destino))
+    if puladas:
+        print(f"{puladas} músicas já baixadas anteriormente foram puladas.")
+    if not pendentes:
+        estado.fechar()
+        print("Nada novo para baixar.")
+        return [], []
+
+    opcoes_busca = {"extract_flat": "in_playlist"}
+    opcoes_download = {
+        "format": "bestaudio/best",
+        "outtmpl": os.path.join(pasta_brutos, "%(title)s [%(id)s].%(ext)s"),
+    }
+
+    reservas = Reservas()
+
+    def baixar(ydl, item):
+        # Linhas que resolvem para uma mídia já reservada seguem sem baixar de novo
+        return baixar_audio_bruto(ydl, item) if reservas.reservar(item) else item
+
+    def extrair(_, item):
+        if "duplicada_de" in item:
+            return item
+        return registrar_concluida(estado, extrair_item(pasta_destino, modo, qualidade, item))
+
+    estagios = [
+        Estagio("busca", lambda ydl, item: resolver_musica(ydl, item, cache), workers_busca, tentativas,
+                inicializar=lambda: fabrica_ydl(opcoes_busca), finalizar=fechar_ydl),
+        Estagio("download", baixar, workers_download, tentativas,
+                inicializar=lambda: fabrica_ydl(opcoes_download), finalizar=fechar_ydl),
+        # Workers próprios para a extração: os downloads seguem enquanto o ffmpeg codifica
+        Estagio("extração", extrair, workers_extracao or os.cpu_count() or 2, tentativas),
+    ]
+
+    def registrar_falha(nome_estagio, item, erro):
+        estado.registrar(item["linha"], "erro", item.get("id"), item.get("url"), erro=f"{nome_estagio}: {erro}")
+
+    inicio = time.time()
+    try:
+        concluidos, falhas = executar_pipeline(pendentes, estagios, ao_falhar=registrar_falha)
+
+        arquivos = {item["linha"]: item["arquivo"] for item in concluidos if "arquivo" in item}
+        duplicadas = []
+        for item in concluidos:
+            if "duplicada_de" not in item:
+                continue
+            if item["duplicada_de"] in arquivos:
+                item["arquivo"] = arquivos[item["duplicada_de"]]
+                registrar_concluida(estado, item)
+                duplicadas.append(item)
+            else:
+                # A linha dona da mídia falhou: esta não tem arquivo nenhum
+                erro = ErroDefinitivo(f"mesma mídia de '{item['duplicada_de']}', que falhou")
+                falhas.append(("download", item, erro))
+                registrar_falha("download", item, erro)
+        concluidos = [item for item in concluidos if "arquivo" in item]
+    finally:
+        estado.fechar()
+
+    print(f"\n{len(arquivos)} de {len(pendentes)} músicas baixadas em {time.time() - inicio:.0f}s.")
+    for item in duplicadas:
+        print(f"  {item['linha']}: mesma mídia de '{item['duplicada_de']}'")
+    if falhas:
+        print(f"{len(falhas)} falharam:")
+        for nome_estagio, item, erro in falhas:
+            print(f"  [{nome_estagio}] {item['linha']}: {erro}")
+    if cache:
+        print(cache.relatorio())
+    return concluidos, falhas
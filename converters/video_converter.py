@@ -1,4 +1,3 @@
-#!/usr/bin/env python3
 """
 Script de conversão em lote de vídeos para MP4 (H.264 + AAC)
 Com upscale para 720p mínimo, efeito blur nas bordas e legendas embutidas
@@ -13,9 +12,10 @@ import threading
 from pathlib import Path
 from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime, timedelta
-import argparse
 import sys
 
+from .rastreamento import rastreado, span
+
 # Formatos de vídeo suportados para conversão
 VIDEO_EXTENSIONS = {'.mp4', '.mkv', '.avi', '.mov', '.wmv', '.flv', 
                    '.webm', '.m4v', '.mpg', '.mpeg', '.3gp', '.ts', 
@@ -115,6 +115,7 @@ class VideoConverter:
         self.log_file = self.output_dir / f'conversion_log_{datetime.now():%Y%m%d_%H%M%S}.txt'
         self.progress = None
         
+    @rastreado("log")
     def log(self, message, print_to_console=True):
         """Registra mensagens no arquivo de log"""
         timestamp = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
@@ -142,6 +143,7 @@ class VideoConverter:
             print("  macOS: brew install ffmpeg")
             return False
     
+    @rastreado("probe", lambda self, video_path: {"arquivo": video_path.name})
     def get_video_info(self, video_path):
         """Obtém informações do vídeo usando ffprobe"""
         try:
@@ -238,6 +240,7 @@ class VideoConverter:
             return ";".join(filters), video_label
         return None, "[0:v]"
     
+    @rastreado("convert_video", lambda self, input_path: {"arquivo": input_path.name})
     def convert_video(self, input_path):
         """Converte um vídeo individual"""
         try:
@@ -367,29 +370,30 @@ class VideoConverter:
             # Executa conversão COM FEEDBACK
             print(f"{Colors.YELLOW}  ⚙ Convertendo... (isso pode demorar){Colors.ENDC}")
             
-            process = subprocess.Popen(
-                cmd,
-                stdout=subprocess.PIPE,
-                stderr=subprocess.PIPE,
-                universal_newlines=True,
-                bufsize=1
-            )
-            
-            # Lê progresso do FFmpeg
-            last_time = 0
-            for line in process.stdout:
-                if 'out_time_ms=' in line:
-                    try:
-                        time_ms = int(line.split('=')[1]) / 1000000
-                        if time_ms > last_time + 5:  # Atualiza a cada 5 segundos
-                            last_time = time_ms
-                            mins = int(time_ms / 60)
-                            secs = int(time_ms % 60)
-                            print(f"\r{Colors.CYAN}  ⏱ Tempo processado: {mins:02d}:{secs:02d}{Colors.ENDC}", end='')
-                    except:
-                        pass
-            
-            process.wait()
+            with span("encode", arquivo=input_path.name):
+                process = subprocess.Popen(
+                    cmd,
+                    stdout=subprocess.PIPE,
+                    stderr=subprocess.PIPE,
+                    universal_newlines=True,
+                    bufsize=1
+                )
+            
+                # Lê progresso do FFmpeg
+                last_time = 0
+                for line in process.stdout:
+                    if 'out_time_ms=' in line:
+                        try:
+                            time_ms = int(line.split('=')[1]) / 1000000
+                            if time_ms > last_time + 5:  # Atualiza a cada 5 segundos
+                                last_time = time_ms
+                                mins = int(time_ms / 60)
+                                secs = int(time_ms % 60)
+                                print(f"\r{Colors.CYAN}  ⏱ Tempo processado: {mins:02d}:{secs:02d}{Colors.ENDC}", end='')
+                        except:
+                            pass
+            
+                process.wait()
             print()  # Nova linha após progresso
             
             if process.returncode == 0:
@@ -428,6 +432,7 @@ class VideoConverter:
                 temp_output.unlink()
             return {'status': 'error', 'path': str(input_path), 'error': str(e)}
     
+    @rastreado("walk")
     def find_videos(self):
         """Encontra todos os vídeos na pasta e subpastas"""
         videos = []
@@ -495,67 +500,3 @@ class VideoConverter:
         print(f"  {Colors.RED}✗ Erros: {results['error']}{Colors.ENDC}")
         print(f"\n{Colors.BLUE}Log salvo em: {self.log_file}{Colors.ENDC}")
         print(f"{Colors.HEADER}{'='*80}{Colors.ENDC}")
-
-
-def main():
-    parser = argparse.ArgumentParser(
-        description='Converte vídeos em lote para MP4 (H.264 + AAC) com upscale e legendas',
-        formatter_class=argparse.RawDescriptionHelpFormatter,
-        epilog="""
-Exemplos de uso:
-  python converter.py /caminho/pasta/videos
-  python converter.py /origem -o /destino -t 4
-  python converter.py /videos --delete-original --bitrate 10M
-  python converter.py /videos --min-height 1080
-  python converter.py /videos --dry-run
-        """
-    )
-    
-    parser.add_argument('source', nargs='?', help='Pasta com os vídeos para converter')
-    parser.add_argument('-o', '--output', help='Pasta de destino (padrão: mesma da origem)')
-    parser.add_argument('-t', '--threads', type=int, default=2,
-                       help='Número de conversões simultâneas (padrão: 2)')
-    parser.add_argument('--min-height', type=int, default=720,
-                       help='Altura mínima em pixels (padrão: 720)')
-    parser.add_argument('--delete-original', action='store_true',
-                       help='Deleta arquivos originais após conversão bem-sucedida')
-    parser.add_argument('--bitrate', help='Bitrate alvo (ex: 8M, 12M). Se não especificado, calcula automaticamente')
-    parser.add_argument('--dry-run', action='store_true',
-                       help='Simula a conversão sem processar arquivos')
-    
-    args = parser.parse_args()
-    
-    # Se não passou o source, pede interativamente
-    source_path = args.source
-    if not source_path:
-        print(f"{Colors.CYAN}{'='*80}{Colors.ENDC}")
-        print(f"{Colors.BOLD}CONVERSOR DE VÍDEOS EM LOTE{Colors.ENDC}")
-        print(f"{Colors.CYAN}{'='*80}{Colors.ENDC}\n")
-        source_path = input(f"{Colors.YELLOW}Digite o caminho da pasta com os vídeos: {Colors.ENDC}").strip().strip('"').strip("'")
-        
-        if not source_path:
-            print(f"{Colors.RED}Nenhum caminho fornecido. Encerrando.{Colors.ENDC}")
-            return
-    
-    # Valida pasta de origem
-    if not os.path.isdir(source_path):
-        print(f"{Colors.RED}ERRO: Pasta não encontrada: {source_path}{Colors.ENDC}")
-        return
-    
-    # Cria conversor
-    converter = VideoConverter(
-        source_dir=source_path,
-        output_dir=args.output,
-        threads=args.threads,
-        delete_original=args.delete_original,
-        target_bitrate=args.bitrate,
-        dry_run=args.dry_run,
-        min_height=args.min_height
-    )
-    
-    # Executa conversão
-    converter.run()
-
-
-if __name__ == '__main__':
-    main()
\ No newline at end of file
@@ -0,0 +1,99 @@
+import os
+import json
+import subprocess
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from .padroes import PASTA_VIDEOS_CONVERTIDOS
+from .rastreamento import rastreado, span
+
+# Codecs que qualquer player toca dentro de MP4: copiados sem reencodar
+VIDEO_MP4 = {'h264', 'hevc'}
+AUDIO_MP4 = {'aac', 'mp3'}
+
+# Codecs aceitos pelo contêiner MP4, mas só por players recentes
+# (navegadores, VLC, mpv, Plex...): copiados apenas com --remux
+VIDEO_MP4_MODERNO = {'vp9', 'av1'}
+AUDIO_MP4_MODERNO = {'opus', 'flac'}
+
+
+@rastreado('probe', lambda caminho: {'arquivo': os.path.basename(caminho)})
+def analisar_video(caminho):
+    """Devolve os codecs de vídeo e áudio do arquivo usando ffprobe."""
+    resultado = subprocess.run(
+        ['ffprobe', '-v', 'quiet', '-print_format', 'json', '-show_streams', caminho],
+        capture_output=True, text=True, check=True,
+    )
+    streams = json.loads(resultado.stdout).get('streams', [])
+    video = next((s['codec_name'] for s in streams if s.get('codec_type') == 'video'), None)
+    audio = next((s['codec_name'] for s in streams if s.get('codec_type') == 'audio'), None)
+    return video, audio
+
+
+def montar_comando(caminho_video, caminho_convertido, video, audio, remux=False, preset='medium', crf=23):
+    """
+    Monta o comando do ffmpeg: cada stream é copiado quando o MP4 (e o player)
+    aceita o codec, e transcodificado para H.264/AAC caso contrário.
+    Devolve (comando, se algum stream será reencodado).
+    """
+    video_ok = VIDEO_MP4 | (VIDEO_MP4_MODERNO if remux else set())
+    audio_ok = AUDIO_MP4 | (AUDIO_MP4_MODERNO if remux else set())
+
+    copiar_video = video in video_ok
+    copiar_audio = audio is None or audio in audio_ok
+
+    cmd = ['ffmpeg', '-y', '-loglevel', 'error', '-i', caminho_video, '-map', '0:v:0', '-map', '0:a:0?']
+    if copiar_video:
+        cmd += ['-c:v', 'copy']
+    else:
+        cmd += ['-c:v', 'libx264', '-preset', preset, '-crf', str(crf), '-pix_fmt', 'yuv420p']
+    if copiar_audio:
+        cmd += ['-c:a', 'copy']
+    else:
+        cmd += ['-c:a', 'aac', '-b:a', '192k']
+    cmd += ['-movflags', '+faststart', '-f', 'mp4', caminho_convertido]
+    return cmd, not (copiar_video and copiar_audio)
+
+
+def converter_video(caminho_video, caminho_convertido, remux=False, preset='medium', crf=23):
+    """Converte um .webm para .mp4. Devolve 'remux' ou 'transcodificado'."""
+    video, audio = analisar_video(caminho_video)
+    if video is None:
+        raise RuntimeError("nenhum stream de vídeo encontrado")
+
+    temporario = f"{caminho_convertido}.tmp"
+    cmd, reencoda = montar_comando(caminho_video, temporario, video, audio, remux, preset, crf)
+    with span('encode', arquivo=os.path.basename(caminho_video), reencoda=reencoda):
+        resultado = subprocess.run(cmd, capture_output=True, text=True)
+    if resultado.returncode != 0:
+        if os.path.exists(temporario):
+            os.remove(temporario)
+        raise RuntimeError(f"FFmpeg erro: {resultado.stderr.strip()[-500:]}")
+    os.replace(temporario, caminho_convertido)
+    return 'transcodificado' if reencoda else 'remux'
+
+
+def converter_pasta(pasta, pasta_convertida=None, workers=2, remux=False, preset='medium', crf=23):
+    """Converte todos os .webm da pasta, vários ao mesmo tempo."""
+    pasta_convertida = pasta_convertida or os.path.join(pasta, PASTA_VIDEOS_CONVERTIDOS)
+    os.makedirs(pasta_convertida, exist_ok=True)
+
+    tarefas = {}
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        for arquivo in os.listdir(pasta):
+            if arquivo.endswith('.webm'):
+                caminho_video = os.path.join(pasta, arquivo)
+                novo_nome = f"{os.path.splitext(arquivo)[0]}.mp4"
+                caminho_convertido = os.path.join(pasta_convertida, novo_nome)
+                futuro = executor.submit(converter_video, caminho_video, caminho_convertido, remux, preset, crf)
+                tarefas[futuro] = arquivo
+
+        resultados = {'remux': 0, 'transcodificado': 0, 'erro': 0}
+        for futuro in as_completed(tarefas):
+            arquivo = tarefas[futuro]
+            try:
+                modo = futuro.result()
+                resultados[modo] += 1
+                print(f"{arquivo}: {modo}")
+            except Exception as e:
+                resultados['erro'] += 1
+                print(f"Erro ao converter {arquivo}: {e}")
+    return resultados
@@ -0,0 +1,203 @@
+import os
+import time
+import shutil
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from .importacao_tardia import importar_tardio
+from .duplicatas_imagem import agrupar_duplicatas
+from .padroes import LIMIAR_DUPLICATAS, PASTA_IMAGENS_CONVERTIDAS
+from .rastreamento import rastreado, span
+
+Image = importar_tardio('PIL.Image')
+
+# Formatos de destino: suporte a transparência e opções do save()
+FORMATOS = {
+    'jpeg': {'alpha': False, 'opcoes': lambda q: {'quality': q}},
+    'png':  {'alpha': True,  'opcoes': lambda q: {'compress_level': 6}},
+    'webp': {'alpha': True,  'opcoes': lambda q: {'quality': q, 'method': 4}},
+    'tiff': {'alpha': True,  'opcoes': lambda q: {'compression': 'tiff_deflate'}},
+}
+
+
+def tem_alpha(img):
+    return img.mode in ('RGBA', 'LA', 'PA') or (img.mode == 'P' and 'transparency' in img.info)
+
+
+def reduzir(img, max_lado):
+    """
+    Reduz a imagem para caber em `max_lado` gastando o mínimo de memória:
+    `draft` faz o decoder JPEG já entregar a imagem em escala menor, e
+    `reduce` encolhe por um fator inteiro antes do redimensionamento fino.
+    """
+    if not max_lado or max(img.size) <= max_lado:
+        return img
+    img.draft(img.mode, (max_lado, max_lado))
+    fator = max(img.size) // max_lado
+    if fator >= 2:
+        img = img.reduce(fator)
+    img.thumbnail((max_lado, max_lado), Image.LANCZOS)
+    return img
+
+
+def converter_imagem(caminho_imagem, caminho_convertido, formato='jpeg', qualidade=75, max_lado=None):
+    """Converte uma imagem; roda nos processos do pool."""
+    destino = FORMATOS[formato]
+    with Image.open(caminho_imagem) as img:
+        img = reduzir(img, max_lado)
+        # Mantém a transparência quando o formato de destino suporta
+        modo = 'RGBA' if destino['alpha'] and tem_alpha(img) else 'RGB'
+        temporario = f"{caminho_convertido}.tmp"
+        img.convert(modo).save(temporario, formato.upper(), **destino['opcoes'](qualidade))
+    os.replace(temporario, caminho_convertido)
+    return caminho_convertido
+
+
+def _converter(tarefa):
+    try:
+        return converter_imagem(*tarefa), None
+    except Exception as e:
+        return tarefa[0], e
+
+
+@rastreado('walk', lambda pasta, *_, **__: {'pasta': pasta})
+def listar_tarefas(pasta, pasta_convertida, formato, qualidade, max_lado, extensao='.webp', forcar=False):
+    """Monta as conversões pendentes, pulando saídas mais novas que a origem."""
+    tarefas, puladas = [], 0
+    with os.scandir(pasta) as entradas:
+        for entrada in entradas:
+            if not (entrada.is_file() and entrada.name.lower().endswith(extensao)):
+                continue
+            novo_nome = f"{os.path.splitext(entrada.name)[0]}.{formato}"
+            caminho_convertido = os.path.join(pasta_convertida, novo_nome)
+            if not forcar and os.path.exists(caminho_convertido) \
+                    and os.path.getmtime(caminho_convertido) >= entrada.stat().st_mtime:
+                puladas += 1
+                continue
+            tarefas.append((entrada.path, caminho_convertido, formato, qualidade, max_lado))
+    return tarefas, puladas
+
+
+def vincular(origem, destino):
+    """Cria `destino` como hard link de `origem` (ou cópia, se o sistema não suportar)."""
+    if os.path.exists(destino):
+        os.remove(destino)
+    try:
+        os.link(origem, destino)
+    except OSError:
+        shutil.copy2(origem, destino)
+
+
+def converter_lote(tarefas, pasta, workers=None):
+    """Converte as tarefas num pool de processos. Devolve (convertidas, erros)."""
+    convertidas, erros = [], []
+    if not tarefas:
+        return convertidas, erros
+    workers = workers or os.cpu_count() or 2
+    # Os processos do pool não enxergam o rastreador: o span cobre o lote inteiro
+    with span('converter', pasta=pasta, imagens=len(tarefas)), \
+            ProcessPoolExecutor(max_workers=workers) as executor:
+        # chunksize agrupa imagens pequenas e reduz o custo de IPC
+        chunksize = max(1, len(tarefas) // (workers * 4))
+        for caminho, erro in executor.map(_converter, tarefas, chunksize=chunksize):
+            if erro:
+                print(f"Erro ao converter {caminho}: {erro}")
+                erros.append((caminho, erro))
+            else:
+                convertidas.append(caminho)
+    return convertidas, erros
+
+
+def converter_pasta(pasta, pasta_convertida=None, formato='jpeg', qualidade=75, max_lado=None,
+                    workers=None, extensao='.webp', forcar=False, deduplicar=False,
+                    limiar=LIMIAR_DUPLICATAS, vincular_duplicatas=True):
+    """
+    Converte todas as imagens da pasta em paralelo. Devolve (convertidas, puladas, erros).
+
+    Com `deduplicar`, imagens quase idênticas (pelo dHash) são convertidas uma
+    única vez; as demais recebem um hard link da conversão do representativo
+    ou, se `vincular_duplicatas` for False, só aparecem no relatório. Se a
+    conversão do representativo falhar, as duplicatas dele são convertidas.
+    """
+    pasta_convertida = pasta_convertida or os.path.join(pasta, PASTA_IMAGENS_CONVERTIDAS)
+    os.makedirs(pasta_convertida, exist_ok=True)
+
+    tarefas, puladas = listar_tarefas(pasta, pasta_convertida, formato, qualidade, max_lado, extensao, forcar)
+    todas = tarefas
+    duplicatas = {}
+    if deduplicar and len(tarefas) > 1:
+        destinos = {tarefa[0]: tarefa[1] for tarefa in tarefas}
+        with span('duplicatas', pasta=pasta, imagens=len(destinos)):
+            grupos = agrupar_duplicatas(list(destinos), pasta, limiar, workers)
+        for grupo in grupos:
+            for duplicata in grupo[1:]:
+                duplicatas[duplicata] = grupo[0]
+        tarefas = [tarefa for tarefa in tarefas if tarefa[0] not in duplicatas]
+
+    convertidas, erros = converter_lote(tarefas, pasta, workers)
+    if not duplicatas:
+        return convertidas, puladas, erros
+
+    if not vincular_duplicatas:
+        print(f"{len(duplicatas)} duplicatas encontradas:")
+        for duplicata, representativo in sorted(duplicatas.items()):
+            print(f"  {os.path.basename(duplicata)} = {os.path.basename(representativo)}")
+        return convertidas, puladas, erros
+
+    # Sem a conversão do representativo não há o que vincular: as duplicatas
+    # dele voltam para a fila e são convertidas por conta própria
+    concluidas = set(convertidas)
+    orfas = {duplicata for duplicata, representativo in duplicatas.items()
+             if destinos[representativo] not in concluidas}
+    if orfas:
+        extras, erros_extras = converter_lote([tarefa for tarefa in todas if tarefa[0] in orfas],
+                                              pasta, workers)
+        convertidas += extras
+        erros += erros_extras
+
+    vinculadas = sorted((duplicata, representativo) for duplicata, representativo in duplicatas.items()
+                        if duplicata not in orfas)
+    if vinculadas:
+        print(f"{len(vinculadas)} duplicatas vinculadas:")
+        for duplicata, representativo in vinculadas:
+            vincular(destinos[representativo], destinos[duplicata])
+            print(f"  {os.path.basename(duplicata)} = {os.path.basename(representativo)}")
+    if orfas:
+        print(f"{len(orfas)} duplicatas convertidas à parte (o representativo falhou)")
+    return convertidas, puladas, erros
+
+
+def converter_pasta_legado(pasta, pasta_convertida, formato='jpeg'):
+    """Loop sequencial original, mantido só como referência para o benchmark."""
+    for arquivo in os.listdir(pasta):
+        if arquivo.endswith('.webp'):
+            caminho_imagem = os.path.join(pasta, arquivo)
+            with Image.open(caminho_imagem) as img:
+                novo_nome = f"{os.path.splitext(arquivo)[0]}.{formato}"
+                caminho_convertido = os.path.join(pasta_convertida, novo_nome)
+                img.convert("RGB").save(caminho_convertido, formato.upper())
+
+
+def benchmark(pasta, formato, qualidade, max_lado, workers):
+    """Compara imagens por segundo do loop original com o motor paralelo."""
+    total = sum(1 for arquivo in os.listdir(pasta) if arquivo.endswith('.webp'))
+    if not total:
+        print("Nenhuma imagem .webp para o benchmark.")
+        return
+
+    resultados = {}
+    for nome in ('legado', 'paralelo'):
+        saida = tempfile.mkdtemp(prefix=f"bench_{nome}_")
+        try:
+            inicio = time.perf_counter()
+            if nome == 'legado':
+                converter_pasta_legado(pasta, saida, formato)
+            else:
+                converter_pasta(pasta, saida, formato, qualidade, max_lado, workers, forcar=True)
+            resultados[nome] = total / (time.perf_counter() - inicio)
+        finally:
+            shutil.rmtree(saida, ignore_errors=True)
+
+    print(f"Benchmark ({total} imagens, {formato}):")
+    print(f"  Loop original: {resultados['legado']:.1f} imagens/s")
+    print(f"  Paralelo:      {resultados['paralelo']:.1f} imagens/s "
+          f"({resultados['paralelo'] / resultados['legado']:.1f}x)")
@@ -0,0 +1,65 @@
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+from converters import cache_busca
+from converters.cache_busca import CacheBusca
+
+
+class CacheBuscaTeste(unittest.TestCase):
+    def setUp(self):
+        self.temporario = tempfile.TemporaryDirectory()
+        self.addCleanup(self.temporario.cleanup)
+        self.agora = 1_000_000.0
+        relogio = mock.patch.object(cache_busca.time, "time", lambda: self.agora)
+        relogio.start()
+        self.addCleanup(relogio.stop)
+
+    def abrir(self, **opcoes):
+        cache = CacheBusca(os.path.join(self.temporario.name, "buscas.sqlite3"), **opcoes)
+        self.addCleanup(cache.conexao.close)
+        return cache
+
+    def test_acerto_ignora_diferencas_de_caixa_e_pontuacao(self):
+        cache = self.abrir()
+        cache.guardar("Artista - Música", "id1", "https://video.teste/id1", 1.5)
+
+        self.assertEqual(cache.obter("artista  música!"), ("id1", "https://video.teste/id1"))
+        self.assertIsNone(cache.obter("Outra música"))
+        self.assertEqual((cache.acertos, cache.erros, cache.economizado), (1, 1, 1.5))
+
+    def test_resultado_vencido_e_descartado(self):
+        cache = self.abrir(ttl=60)
+        cache.guardar("Artista - Música", "id1", "https://video.teste/id1", 1.0)
+
+        self.agora += 61
+        self.assertIsNone(cache.obter("Artista - Música"))
+        contagem = cache.conexao.execute("SELECT COUNT(*) FROM buscas").fetchone()[0]
+        self.assertEqual(contagem, 0)
+
+    def test_podar_remove_vencidas_e_as_menos_usadas(self):
+        cache = self.abrir(ttl=100, maximo=2)
+        cache.guardar("velha", "id0", "https://video.teste/id0", 1.0)
+        self.agora += 50
+        for consulta in ("a", "b", "c"):
+            self.agora += 1
+            cache.guardar(consulta, consulta, f"https://video.teste/{consulta}", 1.0)
+        self.agora += 1
+        cache.obter("a")  # "a" passa a ser a usada mais recentemente
+
+        self.agora += 49  # "velha" vence; as demais continuam válidas
+        cache.podar()
+        chaves = {linha[0] for linha in cache.conexao.execute("SELECT chave FROM buscas")}
+        self.assertEqual(chaves, {"a", "c"})
+
+    def test_entradas_sobrevivem_entre_execucoes(self):
+        cache = self.abrir()
+        cache.guardar("Artista - Música", "id1", "https://video.teste/id1", 1.0)
+        cache.fechar()
+
+        self.assertEqual(self.abrir().obter("Artista - Música"), ("id1", "https://video.teste/id1"))
+
+
+if __name__ == "__main__":
+    unittest.main()
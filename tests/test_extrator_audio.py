@@ -0,0 +1,66 @@
+import os
+import subprocess
+import tempfile
+import unittest
+from unittest import mock
+
+from converters import extrator_audio
+from converters.estado_downloads import indexar_pasta
+
+
+def ffmpeg_falso(comando, **opcoes):
+    """Grava alguns bytes no arquivo de saída (último argumento), como o ffmpeg faria."""
+    with open(comando[-1], "wb") as arquivo:
+        arquivo.write(b"ID3")
+    return subprocess.CompletedProcess(comando, 0, "", "")
+
+
+class ExtrairAudioTeste(unittest.TestCase):
+    def setUp(self):
+        self.temporario = tempfile.TemporaryDirectory()
+        self.addCleanup(self.temporario.cleanup)
+        self.pasta = self.temporario.name
+
+    def bruto(self):
+        caminho = os.path.join(self.pasta, "Artista - Um [id1].webm")
+        with open(caminho, "wb") as arquivo:
+            arquivo.write(b"webm")
+        return caminho
+
+    def test_saida_so_aparece_completa_e_sem_sobrescrever(self):
+        with open(os.path.join(self.pasta, "Artista - Um.mp3"), "wb") as arquivo:
+            arquivo.write(b"anterior")
+
+        with mock.patch.object(extrator_audio.subprocess, "run", ffmpeg_falso):
+            destino = extrator_audio.extrair_audio(self.bruto(), self.pasta, nome="Artista - Um")
+
+        self.assertEqual(os.path.basename(destino), "Artista - Um (1).mp3")
+        self.assertEqual(sorted(os.listdir(self.pasta)), ["Artista - Um (1).mp3", "Artista - Um.mp3"])
+        with open(os.path.join(self.pasta, "Artista - Um.mp3"), "rb") as arquivo:
+            self.assertEqual(arquivo.read(), b"anterior")
+
+    def test_falhas_nao_deixam_arquivos_para_tras(self):
+        bruto = self.bruto()
+
+        def interrompido(comando, **opcoes):
+            ffmpeg_falso(comando)
+            raise KeyboardInterrupt
+
+        for falha in (FileNotFoundError("ffmpeg"), interrompido,
+                      lambda comando, **opcoes: subprocess.CompletedProcess(comando, 1, "", "erro")):
+            with mock.patch.object(extrator_audio.subprocess, "run", side_effect=falha), \
+                    self.assertRaises((FileNotFoundError, KeyboardInterrupt, RuntimeError)):
+                extrator_audio.extrair_audio(bruto, self.pasta, nome="Artista - Um")
+
+        self.assertEqual(os.listdir(self.pasta), [os.path.basename(bruto)])
+
+    def test_indice_da_pasta_ignora_vazios_e_ocultos(self):
+        for nome, conteudo in (("Um.mp3", b"ID3"), ("Dois.mp3", b""), (".parcial-Tres.mp3", b"ID3")):
+            with open(os.path.join(self.pasta, nome), "wb") as arquivo:
+                arquivo.write(conteudo)
+
+        self.assertEqual(indexar_pasta(self.pasta), {"um": "Um.mp3"})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,147 @@
+import io
+import os
+import re
+import tempfile
+import threading
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest import mock
+
+from converters import mp4_to_mp3
+
+yt_dlp = mp4_to_mp3.yt_dlp
+
+# Pequeno para que o arquivo de teste seja dividido em vários fragmentos
+FRAGMENTO = 1000
+DADOS = bytes(range(256)) * 41  # 10.496 bytes: 11 fragmentos, o último incompleto
+
+
+class ServidorAudio(BaseHTTPRequestHandler):
+    """Serve DADOS como /musica.webm, com ou sem suporte a HTTP Range."""
+
+    aceita_range = True
+    pedidos = []
+
+    def do_HEAD(self):
+        self.responder(enviar_corpo=False)
+
+    def do_GET(self):
+        self.responder()
+
+    def responder(self, enviar_corpo=True):
+        intervalo = re.fullmatch(r"bytes=(\d+)-(\d*)", self.headers.get("Range", ""))
+        self.pedidos.append(self.headers.get("Range"))
+        if intervalo and self.aceita_range:
+            inicio = int(intervalo.group(1))
+            fim = min(int(intervalo.group(2) or len(DADOS) - 1), len(DADOS) - 1)
+            corpo = DADOS[inicio:fim + 1]
+            self.send_response(206)
+            self.send_header("Content-Range", f"bytes {inicio}-{fim}/{len(DADOS)}")
+        else:
+            corpo = DADOS
+            self.send_response(200)
+        self.send_header("Content-Type", "audio/webm")
+        self.send_header("Content-Length", str(len(corpo)))
+        self.end_headers()
+        if enviar_corpo:
+            self.wfile.write(corpo)
+
+    def log_message(self, *args):
+        pass
+
+
+class FfmpegFalso:
+    """Substitui o processo do ffmpeg: grava o que chega no stdin no arquivo de saída."""
+
+    processos = []
+
+    def __init__(self, comando, stdin=None, stderr=None):
+        self.stdin = open(comando[-1], "wb")
+        self.stderr = io.BytesIO()
+        self.returncode = None
+        self.morto = False
+        self.processos.append(self)
+
+    def wait(self):
+        self.returncode = -9 if self.morto else 0
+        return self.returncode
+
+    def kill(self):
+        self.morto = True
+
+
+class StreamTeste(unittest.TestCase):
+    def setUp(self):
+        ServidorAudio.aceita_range = True
+        ServidorAudio.pedidos = []
+        self.servidor = ThreadingHTTPServer(("127.0.0.1", 0), ServidorAudio)
+        threading.Thread(target=self.servidor.serve_forever, daemon=True).start()
+        self.addCleanup(self.servidor.server_close)
+        self.addCleanup(self.servidor.shutdown)
+        self.url = f"http://127.0.0.1:{self.servidor.server_port}/musica.webm"
+
+        fragmento = mock.patch.object(mp4_to_mp3, "FRAGMENT_SIZE", FRAGMENTO)
+        fragmento.start()
+        self.addCleanup(fragmento.stop)
+
+        self.ydl = yt_dlp.YoutubeDL({"quiet": True, "no_warnings": True})
+        self.addCleanup(self.ydl.close)
+
+    def transmitir(self):
+        saida = io.BytesIO()
+        mp4_to_mp3.stream_to_ffmpeg(self.ydl, {"url": self.url}, saida, fragments=3)
+        return saida.getvalue()
+
+    def test_fragmentos_paralelos_chegam_em_ordem(self):
+        self.assertEqual(self.transmitir(), DADOS)
+        self.assertEqual(len(ServidorAudio.pedidos), 11)
+        self.assertIn("bytes=10000-10495", ServidorAudio.pedidos)
+
+    def test_servidor_sem_range_le_a_resposta_inteira(self):
+        ServidorAudio.aceita_range = False
+        self.assertEqual(self.transmitir(), DADOS)
+        self.assertEqual(len(ServidorAudio.pedidos), 1)
+
+    def test_download_batch_transmite_para_o_ffmpeg(self):
+        with tempfile.TemporaryDirectory() as pasta, \
+                mock.patch.object(mp4_to_mp3.subprocess, "Popen", FfmpegFalso), \
+                mock.patch.object(mp4_to_mp3.rich_console, "Console"):
+            arquivos, erros = mp4_to_mp3.download_batch([self.url], modo="original", workers=1,
+                                                        output_dir=pasta)
+            self.assertEqual(erros, [])
+            self.assertEqual(len(arquivos), 1)
+            self.assertEqual(os.path.dirname(arquivos[0]), pasta)
+            with open(arquivos[0], "rb") as arquivo:
+                self.assertEqual(arquivo.read(), DADOS)
+
+    def pipe(self, pasta):
+        ydl = yt_dlp.YoutubeDL({"quiet": True, "outtmpl": os.path.join(pasta, "%(title)s.%(ext)s")})
+        self.addCleanup(ydl.close)
+        info = {"id": "id1", "title": "Musica", "ext": "webm", "acodec": "opus", "url": self.url}
+        with mock.patch.object(mp4_to_mp3.subprocess, "Popen", FfmpegFalso):
+            return mp4_to_mp3.pipe_entry(ydl, info, pasta, "original", 2)
+
+    def test_pipe_nao_sobrescreve_arquivo_existente(self):
+        with tempfile.TemporaryDirectory() as pasta:
+            with open(os.path.join(pasta, "Musica.opus"), "wb") as arquivo:
+                arquivo.write(b"anterior")
+
+            self.assertEqual(os.path.basename(self.pipe(pasta)), "Musica (1).opus")
+            self.assertEqual(sorted(os.listdir(pasta)), ["Musica (1).opus", "Musica.opus"])
+            with open(os.path.join(pasta, "Musica.opus"), "rb") as arquivo:
+                self.assertEqual(arquivo.read(), b"anterior")
+
+    def test_pipe_com_erro_espera_o_ffmpeg_e_nao_deixa_arquivos(self):
+        FfmpegFalso.processos = []
+        with tempfile.TemporaryDirectory() as pasta, \
+                mock.patch.object(mp4_to_mp3, "stream_to_ffmpeg", side_effect=ConnectionResetError):
+            with self.assertRaises(ConnectionResetError):
+                self.pipe(pasta)
+            self.assertEqual(os.listdir(pasta), [])
+        processo, = FfmpegFalso.processos
+        self.assertTrue(processo.morto)
+        self.assertIsNotNone(processo.returncode)
+
+
+if __name__ == "__main__":
+    unittest.main()
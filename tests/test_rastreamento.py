@@ -0,0 +1,31 @@
+import os
+import pstats
+import tempfile
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import redirect_stdout
+from io import StringIO
+
+from converters.rastreamento import executar_com_perfil
+
+
+def trabalho_da_thread(n):
+    return sum(range(n))
+
+
+class PerfilTeste(unittest.TestCase):
+    def test_perfil_inclui_as_threads_de_trabalho(self):
+        def executar():
+            with ThreadPoolExecutor(2) as executor:
+                list(executor.map(trabalho_da_thread, [1000] * 4))
+
+        with tempfile.TemporaryDirectory() as pasta, redirect_stdout(StringIO()):
+            prefixo = os.path.join(pasta, "perfil")
+            executar_com_perfil(executar, prefixo)
+            chamadas = {funcao[2]: dados[0] for funcao, dados in pstats.Stats(f"{prefixo}.prof").stats.items()}
+
+        self.assertEqual(chamadas["trabalho_da_thread"], 4)
+
+
+if __name__ == "__main__":
+    unittest.main()
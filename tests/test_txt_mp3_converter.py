@@ -0,0 +1,164 @@
+import os
+import tempfile
+import threading
+import unittest
+from unittest import mock
+
+from converters import txt_mp3_converter
+from converters.estado_downloads import NOME_BANCO, EstadoDownloads
+from converters.extrator_audio import reservar_destino
+
+
+class YdlFalso:
+    """
+    Substitui o YoutubeDL: a busca devolve o ID configurado para a linha e o
+    download só cria um arquivo bruto vazio a partir do outtmpl.
+    """
+
+    def __init__(self, midias, opcoes, downloads, falhar):
+        self.midias = midias
+        self.opcoes = opcoes
+        self.downloads = downloads
+        self.falhar = falhar
+
+    def extract_info(self, url, download=False, process=True):
+        if url.startswith("ytsearch1:"):
+            media_id, _ = self.midias[url[len("ytsearch1:"):]]
+            return {"entries": [{"id": media_id, "url": f"https://video.teste/{media_id}"}]}
+
+        media_id = url.rsplit("/", 1)[1]
+        if media_id in self.falhar:
+            raise RuntimeError("HTTP Error 403")
+        titulo = next(titulo for i, titulo in self.midias.values() if i == media_id)
+        info = {"id": media_id, "title": titulo, "ext": "webm"}
+        bruto = self.opcoes["outtmpl"].replace("%(title)s", titulo).replace("%(id)s", media_id) \
+            .replace("%(ext)s", "webm")
+        with open(bruto, "wb"):
+            pass
+        self.downloads.append(media_id)
+        return {**info, "requested_downloads": [{"filepath": bruto, "acodec": "opus"}]}
+
+    def close(self):
+        pass
+
+
+def extrair_audio_falso(bruto, pasta, modo="mp3", qualidade="192", codec=None, nome=None):
+    destino = reservar_destino(pasta, nome, "mp3")
+    with open(destino, "wb") as arquivo:
+        arquivo.write(b"ID3")
+    os.remove(bruto)
+    return destino
+
+
+class BaixarListaTeste(unittest.TestCase):
+    def setUp(self):
+        self.temporario = tempfile.TemporaryDirectory()
+        self.pasta = self.temporario.name
+        self.lista = os.path.join(self.pasta, "lista.txt")
+        self.midias = {}
+        self.downloads = []
+        self.falhar = set()
+        patcher = mock.patch.object(txt_mp3_converter, "extrair_audio", extrair_audio_falso)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.addCleanup(self.temporario.cleanup)
+
+    def escrever_lista(self, *linhas):
+        with open(self.lista, "w", encoding="utf-8") as arquivo:
+            arquivo.write("\n".join(linhas) + "\n")
+
+    def baixar(self, fabrica=None, workers=1):
+        def fabrica_falsa(opcoes=None):
+            return YdlFalso(self.midias, opcoes or {}, self.downloads, self.falhar)
+
+        with mock.patch("builtins.print"):
+            return txt_mp3_converter.baixar_lista(
+                self.lista, self.pasta, workers_busca=workers, workers_download=workers, workers_extracao=1,
+                tentativas=1, fabrica_ydl=fabrica or fabrica_falsa)
+
+    def estado(self):
+        estado = EstadoDownloads(os.path.join(self.pasta, NOME_BANCO))
+        try:
+            return estado.carregar()
+        finally:
+            estado.fechar()
+
+    def test_pula_linhas_ja_baixadas(self):
+        self.midias = {"Artista - Um": ("id1", "Um"), "Artista - Dois": ("id2", "Dois")}
+        self.escrever_lista("Artista - Um", "Artista - Dois")
+
+        concluidos, falhas = self.baixar()
+        self.assertEqual(len(concluidos), 2)
+        self.assertEqual(falhas, [])
+
+        self.assertEqual(self.baixar(), ([], []))
+        self.assertEqual(sorted(self.downloads), ["id1", "id2"])
+
+    def test_refaz_so_a_linha_que_falhou(self):
+        self.midias = {"Artista - Um": ("id1", "Um"), "Artista - Dois": ("id2", "Dois")}
+        self.escrever_lista("Artista - Um", "Artista - Dois")
+        self.falhar.add("id2")
+
+        concluidos, falhas = self.baixar()
+        self.assertEqual([item["linha"] for item in concluidos], ["Artista - Um"])
+        self.assertEqual([(estagio, item["linha"]) for estagio, item, _ in falhas],
+                         [("download", "Artista - Dois")])
+        self.assertEqual({registro["status"] for registro in self.estado().values()}, {"ok", "erro"})
+
+        self.falhar.clear()
+        concluidos, falhas = self.baixar()
+        self.assertEqual([item["linha"] for item in concluidos], ["Artista - Dois"])
+        self.assertEqual(falhas, [])
+        self.assertEqual(self.downloads, ["id1", "id2"])
+
+    def test_mesma_midia_baixada_uma_vez(self):
+        self.midias = {"Artista - Um": ("id1", "Um"), "Artista - Um (ao vivo)": ("id1", "Um")}
+        self.escrever_lista("Artista - Um", "Artista - Um (ao vivo)")
+
+        concluidos, falhas = self.baixar()
+        self.assertEqual(falhas, [])
+        self.assertEqual(self.downloads, ["id1"])
+        self.assertEqual({item["arquivo"] for item in concluidos}, {os.path.join(self.pasta, "Um.mp3")})
+        self.assertEqual({registro["status"] for registro in self.estado().values()}, {"ok"})
+
+    def test_duplicada_de_linha_que_falhou_e_reportada(self):
+        self.midias = {"Artista - Um": ("id1", "Um"), "Artista - Um (ao vivo)": ("id1", "Um")}
+        self.escrever_lista("Artista - Um", "Artista - Um (ao vivo)")
+        self.falhar.add("id1")
+
+        concluidos, falhas = self.baixar()
+        self.assertEqual(concluidos, [])
+        self.assertEqual(sorted(item["linha"] for _, item, _ in falhas),
+                         ["Artista - Um", "Artista - Um (ao vivo)"])
+        self.assertEqual({registro["status"] for registro in self.estado().values()}, {"erro"})
+
+    def test_midias_de_mesmo_titulo_nao_colidem(self):
+        self.midias = {"Artista - Um": ("id1", "Um"), "Outro - Um": ("id2", "Um")}
+        self.escrever_lista("Artista - Um", "Outro - Um")
+
+        concluidos, falhas = self.baixar()
+        self.assertEqual(falhas, [])
+        self.assertEqual(sorted(os.path.basename(item["arquivo"]) for item in concluidos),
+                         ["Um (1).mp3", "Um.mp3"])
+
+    def test_estagio_que_nao_inicia_nao_trava_o_pipeline(self):
+        linhas = [f"Artista - Música {n}" for n in range(40)]
+        self.escrever_lista(*linhas)
+
+        def fabrica(opcoes=None):
+            raise ModuleNotFoundError("No module named 'yt_dlp'")
+
+        resultado = []
+        thread = threading.Thread(target=lambda: resultado.append(self.baixar(fabrica, workers=3)), daemon=True)
+        thread.start()
+        thread.join(10)
+        self.assertFalse(thread.is_alive(), "baixar_lista travou")
+
+        concluidos, falhas = resultado[0]
+        self.assertEqual(concluidos, [])
+        self.assertEqual(sorted(item["linha"] for _, item, _ in falhas), sorted(linhas))
+        self.assertEqual({registro["status"] for registro in self.estado().values()}, {"erro"})
+
+
+if __name__ == "__main__":
+    unittest.main()